@@ -2,5 +2,29 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cf_ratings.settings')
+# keeps the sync-only WhiteNoise middleware out of MIDDLEWARE (see settings.py)
+os.environ['CF_ASGI'] = '1'
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# these need the app registry
+from cf_ratings.static_files import ASGIStaticFiles  # noqa: E402
+from problems.services import close_shared_client, open_shared_client  # noqa: E402
+
+http_application = ASGIStaticFiles(django_application)
+
+
+async def application(scope, receive, send):
+    # Django only speaks HTTP; lifespan events open and close the pooled Codeforces API client
+    # for the lifetime of the server's event loop.
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await open_shared_client()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await close_shared_client()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    await http_application(scope, receive, send)
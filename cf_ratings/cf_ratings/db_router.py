@@ -0,0 +1,85 @@
+"""Read-replica routing.
+
+Views that opt in with `ReplicaReadMixin` send their reads to one of
+`settings.REPLICA_DATABASES` on GET/HEAD. After any write request the client gets a
+short-lived cookie that pins its reads to `default`, so users always see their own
+ratings and status changes even when the replicas lag behind.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+PIN_COOKIE = 'db_pin_primary'
+# Only these apps are routed; sessions, admin log, contenttypes etc. always use `default`.
+ROUTED_APPS = {'problems', 'auth'}
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+@contextmanager
+def read_from_replica():
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def is_pinned_to_primary(request):
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'REPLICA_DATABASES', [])
+        if replicas and _use_replica.get() and model._meta.app_label in ROUTED_APPS:
+            return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same data as default
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in getattr(settings, 'REPLICA_DATABASES', [])
+
+
+class ReplicaReadMixin:
+    """Route a read-only view's GET/HEAD queries to a replica unless the client recently wrote."""
+    def dispatch(self, request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD') or not getattr(settings, 'REPLICA_DATABASES', [])
+                or is_pinned_to_primary(request)):
+            return super().dispatch(request, *args, **kwargs)
+        if self.view_is_async:
+            return self._replica_adispatch(request, *args, **kwargs)
+        with read_from_replica():
+            return self._render(super().dispatch(request, *args, **kwargs))
+
+    async def _replica_adispatch(self, request, *args, **kwargs):
+        with read_from_replica():
+            return self._render(await super().dispatch(request, *args, **kwargs))
+
+    def _render(self, response):
+        # TemplateResponses render after the view returns; do it while still on the replica
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.render()
+        return response
+
+
+class PinPrimaryAfterWriteMiddleware(MiddlewareMixin):
+    """Pin the client to `default` for REPLICA_STICKY_SECONDS after a POST/PUT/PATCH/DELETE."""
+    def process_response(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE') and getattr(settings, 'REPLICA_DATABASES', []):
+            seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+            response.set_cookie(PIN_COOKIE, str(time.time() + seconds), max_age=seconds, httponly=True, samesite='Lax')
+        return response
@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -15,6 +16,8 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    # serve static files through WhiteNoise under runserver too, so dev matches production
+    'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
     'problems',
 ]
@@ -25,9 +28,15 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'problems.middleware.UserProfileMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'cf_ratings.db_router.PinPrimaryAfterWriteMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+# WhiteNoise's middleware is sync-only and would push every ASGI request through one thread;
+# asgi.py sets CF_ASGI=1 and serves static files with cf_ratings.static_files instead.
+if not os.environ.get('CF_ASGI'):
+    MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
 
 ROOT_URLCONF = 'cf_ratings.urls'
 
@@ -56,6 +65,45 @@ DATABASES = {
     }
 }
 
+# Read replicas for read-heavy views (see cf_ratings/db_router.py). Set CF_REPLICA_DBS to a
+# comma-separated list of SQLite files to try it locally, e.g. CF_REPLICA_DBS=replica.sqlite3
+# after `manage.py refresh_sqlite_replicas`.
+REPLICA_DATABASES = []
+for i, name in enumerate(n for n in os.environ.get('CF_REPLICA_DBS', '').split(',') if n.strip()):
+    alias = f'replica{i + 1}'
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['cf_ratings.db_router.ReplicaRouter']
+# How long a client's reads stay on `default` after it writes (read-your-writes)
+REPLICA_STICKY_SECONDS = 10
+
+# Codeforces API base URL. Point it at a local mock (`manage.py serve_cf_mock`) for offline
+# development and benchmarks, e.g. CF_API_BASE=http://127.0.0.1:8765/api
+CODEFORCES_API_BASE = os.environ.get('CF_API_BASE', 'https://codeforces.com/api')
+
+# Anonymous full-page cache (problems/page_cache.py). The default local-memory cache is per
+# process; with several workers set CF_CACHE_URL=redis://... (needs the `redis` package) so a
+# purge reaches every worker.
+if os.environ.get('CF_CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['CF_CACHE_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -79,6 +127,18 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# `collectstatic` writes content-hashed copies plus .gz/.br variants; WhiteNoise serves the
+# pre-compressed file matching Accept-Encoding with a far-future immutable Cache-Control.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
+# The test runner forces DEBUG=False, where the manifest storage resolves every {% static %} through
+# the collected staticfiles.json; tests use the plain storage so they do not depend on collectstatic.
+if sys.argv[1:2] == ['test']:
+    STORAGES['staticfiles'] = {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}
 
 # Media files (uploads)
 MEDIA_URL = '/media/'
@@ -0,0 +1,58 @@
+"""Static file serving for the ASGI app.
+
+`whitenoise.middleware.WhiteNoiseMiddleware` is sync-only, and one sync middleware makes Django
+run every request of an ASGI server through a single thread. So under ASGI it is left out of
+`MIDDLEWARE` (see settings.py), and `ASGIStaticFiles` wraps the ASGI application instead. It
+reuses WhiteNoise's file table and responses (hashed names cached forever, pre-compressed
+variants, conditional and range requests) and does the file I/O in worker threads.
+"""
+from asgiref.sync import sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ASGIStaticFiles:
+    def __init__(self, application):
+        self.application = application
+        # configured from the same settings as the middleware; only its file lookup is used
+        self.whitenoise = WhiteNoiseMiddleware()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            static_file = await self._find(scope['path'])
+            if static_file is not None:
+                return await self._serve(static_file, scope, send)
+        await self.application(scope, receive, send)
+
+    async def _find(self, path):
+        if self.whitenoise.autorefresh:
+            # development only: looks at the filesystem on every request
+            return await sync_to_async(self.whitenoise.find_file, thread_sensitive=False)(path)
+        return self.whitenoise.files.get(path)
+
+    async def _serve(self, static_file, scope, send):
+        # WhiteNoise reads request headers in WSGI environ form
+        environ = {
+            'HTTP_' + name.decode('latin-1').upper().replace('-', '_'): value.decode('latin-1')
+            for name, value in scope['headers']
+        }
+        response = await sync_to_async(static_file.get_response, thread_sensitive=False)(scope['method'], environ)
+        await send({
+            'type': 'http.response.start',
+            'status': int(response.status),
+            'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in response.headers],
+        })
+        if response.file is None:
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        read = sync_to_async(response.file.read, thread_sensitive=False)
+        try:
+            while True:
+                chunk = await read(CHUNK_SIZE)
+                more = len(chunk) == CHUNK_SIZE
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': more})
+                if not more:
+                    break
+        finally:
+            response.file.close()
@@ -1,19 +1,109 @@
-from django.contrib import admin
-from .models import UserProfile, Tag, Problem, Rating
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .models import UserProfile, Tag, Problem, Rating, UserProblem
+from .similarity import index_problems
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that avoids a full COUNT(*) on large unfiltered changelists.
+
+    Uses the database's table statistics (or SQLite's max rowid) when the queryset has
+    no filters and the estimate is above `EXACT_COUNT_LIMIT`; otherwise counts exactly.
+    """
+    EXACT_COUNT_LIMIT = 10000
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if getattr(qs, 'query', None) is not None and not qs.query.where:
+            estimate = self._estimate(qs)
+            if estimate is not None and estimate > self.EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
+
+    def _estimate(self, qs):
+        table = qs.model._meta.db_table
+        connection = connections[qs.db]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+            elif connection.vendor == 'mysql':
+                cursor.execute(
+                    'SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s',
+                    [table],
+                )
+            elif connection.vendor == 'sqlite':
+                cursor.execute(f'SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}')
+            else:
+                return None
+            row = cursor.fetchone()
+        return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist defaults for tables that can hold millions of rows."""
+    paginator = EstimatedCountPaginator
+    # skip the second, unfiltered COUNT(*) shown next to filtered results
+    show_full_result_count = False
+    list_per_page = 50
+
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'codeforces_handle', 'rating', 'max_rating', 'rank', 'max_rank')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+    search_fields = ('user__username', 'codeforces_handle')
+
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
     list_display = ('name',)
+    search_fields = ('name',)
+
 
 @admin.register(Problem)
-class ProblemAdmin(admin.ModelAdmin):
+class ProblemAdmin(LargeTableAdmin):
     list_display = ('name', 'problem_id', 'contest_id', 'index', 'average_rating', 'owner')
+    list_select_related = ('owner',)
     search_fields = ('name', 'problem_id')
+    autocomplete_fields = ('owner', 'tags')
+    actions = ('recompute_aggregates', 'rebuild_similarity')
+
+    @admin.action(description='Recompute average rating and contest aggregates')
+    def recompute_aggregates(self, request, queryset):
+        count = Problem.recompute_average_ratings(queryset.values_list('pk', flat=True))
+        self.message_user(request, f'Recomputed aggregates for {count} problems.', messages.SUCCESS)
+
+    @admin.action(description='Rebuild similar-problems index')
+    def rebuild_similarity(self, request, queryset):
+        problems = list(queryset.prefetch_related('tags'))
+        index_problems(problems)
+        self.message_user(request, f'Re-indexed {len(problems)} problems.', messages.SUCCESS)
+
 
 @admin.register(Rating)
-class RatingAdmin(admin.ModelAdmin):
-    list_display = ('user', 'problem', 'value')
+class RatingAdmin(LargeTableAdmin):
+    list_display = ('user', 'problem', 'value', 'updated_at')
+    list_select_related = ('user', 'problem')
+    list_filter = ('value',)
+    search_fields = ('problem__problem_id', 'user__username')
+    autocomplete_fields = ('user', 'problem')
+    actions = ('recompute_problem_aggregates',)
+
+    @admin.action(description="Recompute the rated problems' aggregates")
+    def recompute_problem_aggregates(self, request, queryset):
+        count = Problem.recompute_average_ratings(queryset.values_list('problem_id', flat=True).distinct())
+        self.message_user(request, f'Recomputed aggregates for {count} problems.', messages.SUCCESS)
+
+
+@admin.register(UserProblem)
+class UserProblemAdmin(LargeTableAdmin):
+    list_display = ('user', 'problem', 'status', 'added_at')
+    list_select_related = ('user', 'problem')
+    list_filter = ('status',)
+    search_fields = ('problem__problem_id', 'user__username')
+    autocomplete_fields = ('user', 'problem')
@@ -0,0 +1,60 @@
+from django.db import transaction
+
+from .models import Problem, Rating, TagStats, UserProblem
+from .page_cache import profile_pages, purge_pages
+from .trending import record_rating_activity
+
+
+def apply_bulk_entries(user, entries):
+    """Upsert ratings and statuses for many problems at once.
+
+    `entries` is a list of cleaned `BulkEntryForm` data dicts. All problems are
+    resolved in one query, `Rating`/`UserProblem` rows are upserted with one
+    `bulk_create` each inside a single transaction, and the affected problems'
+    averages are recomputed with one grouped UPDATE. Since `bulk_create` skips
+    `post_save`, rating activity, tag solver counts and the profile page are updated here as well
+    (`recompute_average_ratings` purges the problem and list pages).
+
+    Returns a dict with the number of ratings and statuses written and the list
+    of problem ids that could not be found.
+    """
+    # Later entries for the same problem win, like repeated single POSTs would.
+    by_pid = {}
+    for entry in entries:
+        merged = by_pid.setdefault(entry['problem_id'], {})
+        if entry.get('value') is not None:
+            merged['value'] = entry['value']
+        if entry.get('status'):
+            merged['status'] = entry['status']
+
+    problems = {p.problem_id: p for p in Problem.objects.filter(problem_id__in=list(by_pid)).only('pk', 'problem_id')}
+    missing = [pid for pid in by_pid if pid not in problems]
+
+    ratings = []
+    user_problems = []
+    for pid, data in by_pid.items():
+        problem = problems.get(pid)
+        if problem is None:
+            continue
+        if 'value' in data:
+            ratings.append(Rating(user=user, problem=problem, value=data['value']))
+        if 'status' in data:
+            user_problems.append(UserProblem(user=user, problem=problem, status=data['status']))
+
+    with transaction.atomic():
+        if ratings:
+            Rating.objects.bulk_create(
+                ratings, update_conflicts=True, unique_fields=['user', 'problem'], update_fields=['value', 'updated_at'],
+            )
+            rated_pks = [r.problem.pk for r in ratings]
+            Problem.recompute_average_ratings(rated_pks)
+            record_rating_activity(rated_pks)
+        if user_problems:
+            UserProblem.objects.bulk_create(
+                user_problems, update_conflicts=True, unique_fields=['user', 'problem'], update_fields=['status'],
+            )
+            TagStats.refresh_for_problems(up.problem.pk for up in user_problems)
+        if ratings or user_problems:
+            purge_pages(profile_pages(user.username))
+
+    return {'rated': len(ratings), 'marked': len(user_problems), 'missing': missing}
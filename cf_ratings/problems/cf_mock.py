@@ -0,0 +1,225 @@
+"""A local stand-in for the Codeforces API, used for offline development and the benchmark commands.
+
+Serves `user.info`, `user.status`, `user.rating` and `problemset.problems` after a configurable delay,
+either from recorded fixtures (see `manage.py record_cf_fixtures`) or from deterministic synthetic data
+sized like the real API. It can also inject failures and enforce a call limit the way codeforces.com
+does, so error handling can be exercised reproducibly. Point `settings.CODEFORCES_API_BASE` at
+`MockCodeforcesServer.base_url` while it runs.
+"""
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# Roughly the size of the live problemset and of an active user's submission list
+REALISTIC_PROBLEM_COUNT = 10000
+REALISTIC_SUBMISSION_COUNT = 2000
+
+METHODS = ('problemset.problems', 'user.info', 'user.status', 'user.rating')
+SYNTHETIC_TAGS = (
+    'implementation', 'math', 'greedy', 'dp', 'data structures', 'brute force', 'constructive algorithms',
+    'graphs', 'sortings', 'binary search', 'dfs and similar', 'trees', 'strings', 'number theory',
+)
+
+
+def synthetic_problems(count=200):
+    problems = []
+    for i in range(count):
+        contest_id = 1000 + i // 4
+        index = 'ABCD'[i % 4]
+        problem = {
+            'contestId': contest_id, 'index': index, 'name': f'Problem {contest_id}{index}',
+            'type': 'PROGRAMMING', 'rating': 800 + (i % 28) * 100,
+            'tags': [SYNTHETIC_TAGS[(i * 7 + k * 3) % len(SYNTHETIC_TAGS)] for k in range(1 + i % 3)],
+        }
+        if i % 50 == 49:
+            # recent problems are served without a rating on the live API
+            del problem['rating']
+        problems.append(problem)
+    return problems
+
+
+def synthetic_user(handle):
+    return {'handle': handle, 'rating': 1500, 'maxRating': 1650, 'rank': 'specialist', 'maxRank': 'expert'}
+
+
+def synthetic_rating_history(handle, contests=50):
+    changes, rating = [], 1500
+    for i in range(contests):
+        new_rating = rating + ((i * 37) % 120) - 55
+        changes.append({
+            'contestId': 1000 + i, 'contestName': f'Round {1000 + i}', 'handle': handle, 'rank': 100 + i,
+            'ratingUpdateTimeSeconds': 1600000000 + i * 604800, 'oldRating': rating, 'newRating': new_rating,
+        })
+        rating = new_rating
+    return changes
+
+
+def synthetic_submissions(handle, problems, count=50):
+    return [
+        {'id': i, 'author': {'members': [{'handle': handle}]}, 'problem': problems[i % len(problems)],
+         'verdict': 'OK' if i % 3 else 'WRONG_ANSWER'}
+        for i in range(count)
+    ]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        method = url.path.rsplit('/', 1)[-1]
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        time.sleep(server.latency)
+        server.count(method)
+        if server.over_call_limit():
+            server.count('limited')
+            return self._send(503, _encode({'status': 'FAILED', 'comment': 'Call limit exceeded'}))
+        if server.inject_error():
+            server.count('errors')
+            return self._send(503, b'<html><body>Codeforces is temporarily unavailable</body></html>', 'text/html')
+        if method not in METHODS:
+            return self._send(400, _encode({'status': 'FAILED', 'comment': f'Unknown method {method}'}))
+        self._send(200, server.response_body(method, params))
+
+    def _send(self, code, body, content_type='application/json'):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _encode(payload):
+    return json.dumps(payload).encode()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def setup_mock(self, latency, problems, fixtures, error_rate, call_limit, call_window, seed, submissions):
+        self.latency = latency
+        self.problems = problems
+        self.fixtures = Path(fixtures) if fixtures else None
+        self.error_rate = error_rate
+        self.call_limit = call_limit
+        self.call_window = call_window
+        self.submissions = submissions
+        self.stats = Counter()
+        self._random = random.Random(seed)
+        self._calls = deque()
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def handle_error(self, request, client_address):
+        # clients hang up mid-response when a concurrent call fails (asyncio.gather cancels the rest)
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def inject_error(self):
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def over_call_limit(self):
+        """Sliding-window limit of `call_limit` calls per `call_window` seconds, shared by all clients.
+        Rejected calls do not count towards the window."""
+        if not self.call_limit:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            while self._calls and self._calls[0] <= now - self.call_window:
+                self._calls.popleft()
+            if len(self._calls) >= self.call_limit:
+                return True
+            self._calls.append(now)
+            return False
+
+    def response_body(self, method, params):
+        # handle-specific methods are keyed by handle; bodies are encoded once and reused
+        handle = params.get('handles') if method == 'user.info' else params.get('handle', '')
+        key = (method, handle if method != 'problemset.problems' else None)
+        body = self._bodies.get(key)
+        if body is None:
+            body = self._fixture(method, handle) or _encode({'status': 'OK', 'result': self._synthetic(method, handle)})
+            self._bodies[key] = body
+        return body
+
+    def _fixture(self, method, handle):
+        """Recorded response for `method`: `<method>.<handle>.json`, falling back to `<method>.json`."""
+        if self.fixtures is None:
+            return None
+        for name in (f'{method}.{handle}.json' if handle else None, f'{method}.json'):
+            if name and (self.fixtures / name).is_file():
+                return (self.fixtures / name).read_bytes()
+        return None
+
+    def _synthetic(self, method, handle):
+        if method == 'problemset.problems':
+            statistics = [
+                {'contestId': p['contestId'], 'index': p['index'], 'solvedCount': 20000 // (1 + i % 40)}
+                for i, p in enumerate(self.problems)
+            ]
+            return {'problems': self.problems, 'problemStatistics': statistics}
+        if method == 'user.info':
+            return [synthetic_user(h) for h in (handle or '').split(';') if h]
+        if method == 'user.status':
+            return synthetic_submissions(handle, self.problems, count=self.submissions)
+        return synthetic_rating_history(handle)
+
+
+class MockCodeforcesServer:
+    """Run the mock API in a background thread; use as a context manager.
+
+    `fixtures` is a directory of recorded responses; methods without a recording are synthesised.
+    `error_rate` is the fraction of calls answered with an HTTP 503 page, and `call_limit` the number
+    of calls allowed per `call_window` seconds before the API answers "Call limit exceeded".
+    `seed` makes the injected errors reproducible. Per-method call counts, plus `errors` and
+    `limited`, are collected in `stats`.
+    """
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, problems=None, fixtures=None,
+                 error_rate=0.0, call_limit=None, call_window=1.0, seed=0, submissions=50):
+        self.httpd = _Server((host, port), _Handler)
+        self.httpd.setup_mock(
+            latency=latency, problems=problems if problems is not None else synthetic_problems(),
+            fixtures=fixtures, error_rate=error_rate, call_limit=call_limit, call_window=call_window,
+            seed=seed, submissions=submissions,
+        )
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/api'
+
+    @property
+    def stats(self):
+        return self.httpd.stats
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
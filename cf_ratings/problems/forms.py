@@ -1,7 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
-from .models import UserProfile, Problem, Rating
+from .models import UserProfile, Problem, Rating, UserProblem
 import re
 
 
@@ -40,3 +40,21 @@ class RatingForm(forms.ModelForm):
     class Meta:
         model = Rating
         fields = ('value',)
+
+
+class BulkEntryForm(forms.Form):
+    """One `(problem_id, value, status)` entry of a bulk rate/mark submission.
+    `value` and `status` are optional, but at least one of them must be given.
+    """
+    problem_id = forms.CharField(max_length=20)
+    value = forms.IntegerField(min_value=0, max_value=10, required=False)
+    status = forms.ChoiceField(choices=UserProblem.STATUS_CHOICES, required=False)
+
+    def clean_problem_id(self):
+        return self.cleaned_data['problem_id'].strip().upper()
+
+    def clean(self):
+        cleaned = super().clean()
+        if not self.errors and cleaned.get('value') is None and not cleaned.get('status'):
+            raise forms.ValidationError('Provide a rating value, a status, or both.')
+        return cleaned
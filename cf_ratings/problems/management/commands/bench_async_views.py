@@ -0,0 +1,68 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+from problems import services
+from problems.cf_mock import MockCodeforcesServer
+from problems.management.benchutils import throwaway_database
+from problems.models import UserProfile
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent profile-page throughput through the WSGI and ASGI handlers against a local mock Codeforces API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Number of profile requests per run')
+        parser.add_argument('--latency', type=float, default=0.2, help='Mock Codeforces API latency in seconds')
+        parser.add_argument('--workers', type=int, default=8, help='Worker threads for the WSGI run')
+
+    def handle(self, *args, **options):
+        n = options['requests']
+        workers = options['workers']
+        with throwaway_database():
+            user = User.objects.create_user('bench', password='bench')
+            UserProfile.objects.update_or_create(user=user, defaults={'codeforces_handle': 'tourist'})
+            url = f'/user/{user.username}/'
+            # anonymous profile pages are page-cached; the dummy cache makes every request render the view
+            with MockCodeforcesServer(latency=options['latency']) as server, \
+                    override_settings(CODEFORCES_API_BASE=server.base_url, CACHES=NO_CACHE):
+                def wsgi_get(_):
+                    return Client().get(url).status_code
+
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    wsgi_codes = list(pool.map(wsgi_get, range(n)))
+                wsgi_elapsed = time.perf_counter() - start
+
+                async def asgi_run():
+                    # like asgi.py's lifespan startup/shutdown under a real ASGI server
+                    await services.open_shared_client()
+                    try:
+                        client = AsyncClient()
+                        return await asyncio.gather(*(client.get(url) for _ in range(n)))
+                    finally:
+                        await services.close_shared_client()
+
+                # the middleware stack asgi.py runs with: no sync-only WhiteNoise middleware
+                asgi_middleware = [m for m in settings.MIDDLEWARE if m != 'whitenoise.middleware.WhiteNoiseMiddleware']
+                with override_settings(MIDDLEWARE=asgi_middleware):
+                    start = time.perf_counter()
+                    asgi_codes = [r.status_code for r in asyncio.run(asgi_run())]
+                    asgi_elapsed = time.perf_counter() - start
+
+        self.stdout.write(f'Requests: {n}, mock latency: {options["latency"]}s, WSGI workers: {workers}')
+        self._report('WSGI', wsgi_codes, wsgi_elapsed)
+        self._report('ASGI', asgi_codes, asgi_elapsed)
+        self.stdout.write(self.style.SUCCESS(f'ASGI speedup: {wsgi_elapsed / asgi_elapsed:.1f}x'))
+
+    def _report(self, label, codes, elapsed):
+        ok = sum(1 for c in codes if c == 200)
+        self.stdout.write(f'{label}: {len(codes) / elapsed:.1f} req/s ({elapsed:.2f}s total, {ok}/{len(codes)} OK)')
@@ -0,0 +1,87 @@
+import re
+import time
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+
+from problems.cf_mock import REALISTIC_PROBLEM_COUNT, REALISTIC_SUBMISSION_COUNT, MockCodeforcesServer, synthetic_problems
+from problems.management.benchutils import throwaway_database
+from problems.models import Problem, UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Measure add-problem, ratings-refresh and profile-sync throughput against a local mock Codeforces API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--adds', type=int, default=50, help='Problems to add through the add-problem view')
+        parser.add_argument('--syncs', type=int, default=10, help='Profiles to sync through the profile-sync view')
+        parser.add_argument('--problems', type=int, default=REALISTIC_PROBLEM_COUNT, help='Size of the mock problemset')
+        parser.add_argument('--submissions', type=int, default=REALISTIC_SUBMISSION_COUNT, help='Mock submissions per handle')
+        parser.add_argument('--fixtures', help='Directory of recorded responses (see record_cf_fixtures)')
+        parser.add_argument('--latency', type=float, default=0.05, help='Mock API latency in seconds')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of mock calls answered with HTTP 503')
+        parser.add_argument('--call-limit', type=int, help='Mock calls allowed per --call-window')
+        parser.add_argument('--call-window', type=float, default=1.0, help='Call-limit window in seconds')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for error injection')
+
+    def handle(self, *args, **options):
+        problems = synthetic_problems(options['problems'])
+        with throwaway_database():
+            server = MockCodeforcesServer(
+                latency=options['latency'], problems=problems, fixtures=options['fixtures'],
+                error_rate=options['error_rate'], call_limit=options['call_limit'],
+                call_window=options['call_window'], seed=options['seed'], submissions=options['submissions'],
+            )
+            with server, override_settings(CODEFORCES_API_BASE=server.base_url):
+                results = [
+                    ('add-problem', *self._add_problems(problems[:options['adds']])),
+                    ('ratings-refresh', *self._refresh_ratings()),
+                    ('profile-sync', *self._sync_profiles(options['syncs'])),
+                ]
+
+        self.stdout.write(
+            f'Mock API: {len(problems)} problems, latency {options["latency"]}s, error rate {options["error_rate"]}, '
+            f'call limit {options["call_limit"] or "-"}/{options["call_window"]}s'
+        )
+        self.stdout.write(f'{"path":<18}{"ops":>6}{"failed":>8}{"seconds":>10}{"ops/s":>9}')
+        for label, ops, failed, elapsed in results:
+            self.stdout.write(f'{label:<18}{ops:>6}{failed:>8}{elapsed:>10.2f}{ops / elapsed:>9.1f}')
+        stats = server.stats
+        calls = sum(stats[m] for m in stats if m not in ('errors', 'limited'))
+        self.stdout.write(f'API calls: {calls}, injected errors: {stats["errors"]}, call-limited: {stats["limited"]}')
+
+    def _add_problems(self, problems):
+        client = Client()
+        client.force_login(User.objects.create_user('bench', password='bench'))
+        start = time.perf_counter()
+        for p in problems:
+            client.post('/add-problem/', {'problem_id': f"{p['contestId']}{p['index']}"})
+        elapsed = time.perf_counter() - start
+        return len(problems), len(problems) - Problem.objects.count(), elapsed
+
+    def _refresh_ratings(self):
+        out = StringIO()
+        start = time.perf_counter()
+        call_command('fetch_cf_ratings', delay=0, stdout=out, stderr=StringIO())
+        elapsed = time.perf_counter() - start
+        failed = int(re.search(r'Failed: (\d+)', out.getvalue()).group(1))
+        return Problem.objects.count(), failed, elapsed
+
+    def _sync_profiles(self, count):
+        clients = []
+        for i in range(count):
+            user = User.objects.create_user(f'sync{i}', password='bench')
+            UserProfile.objects.update_or_create(user=user, defaults={'codeforces_handle': f'handle{i}'})
+            client = Client()
+            client.force_login(user)
+            clients.append((user.username, client))
+        start = time.perf_counter()
+        for username, client in clients:
+            client.post(f'/user/{username}/sync/')
+        elapsed = time.perf_counter() - start
+        synced = UserProfile.objects.filter(user__username__startswith='sync', rating__isnull=False).count()
+        return count, count - synced, elapsed
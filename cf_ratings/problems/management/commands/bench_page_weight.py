@@ -0,0 +1,92 @@
+import gzip
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from problems.management.benchutils import throwaway_database
+from problems.models import Problem, Tag
+
+try:
+    import brotli
+except ImportError:  # optional; only used to report .br sizes
+    brotli = None
+
+
+class _ResourceParser(HTMLParser):
+    """Collect the sub-resources a browser fetches up front, plus inline <style>/<script> bytes."""
+    def __init__(self):
+        super().__init__()
+        self.resources = []
+        self.inline_bytes = 0
+        self._inline = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'link' and attrs.get('rel') in ('stylesheet', 'preload') and attrs.get('href'):
+            self.resources.append(attrs['href'])
+        elif tag in ('script', 'img') and attrs.get('src'):
+            self.resources.append(attrs['src'])
+        elif tag in ('style', 'script'):
+            self._inline = True
+
+    def handle_endtag(self, tag):
+        if tag in ('style', 'script'):
+            self._inline = False
+
+    def handle_data(self, data):
+        if self._inline:
+            self.inline_bytes += len(data.encode())
+
+
+class Command(BaseCommand):
+    help = 'Report HTML bytes, inline CSS/JS bytes and sub-resource requests per page, plus static asset transfer sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='*', default=['/', '/search/?tag=', '/contests/', '/users/'])
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            self._seed()
+            pages = [(url, Client().get(url).content) for url in options['urls']]
+
+        assets = {}
+        self.stdout.write(f'{"page":<20}{"html B":>9}{"html gz B":>11}{"inline B":>10}{"requests":>10}{"3rd-party":>11}')
+        for url, html in pages:
+            parser = _ResourceParser()
+            parser.feed(html.decode())
+            third_party = [r for r in parser.resources if urlparse(r).netloc]
+            for r in parser.resources:
+                if r.startswith(settings.STATIC_URL):
+                    assets[r] = None
+            self.stdout.write(
+                f'{url:<20}{len(html):>9}{len(gzip.compress(html)):>11}{parser.inline_bytes:>10}'
+                f'{1 + len(parser.resources):>10}{len(third_party):>11}'
+            )
+
+        if assets:
+            self.stdout.write('')
+            self.stdout.write(f'{"static asset":<60}{"raw B":>9}{"gz B":>9}{"br B":>9}')
+            for url in sorted(assets):
+                path = finders.find(re.sub(r'\.[0-9a-f]{12}(\.\w+)$', r'\1', url[len(settings.STATIC_URL):]))
+                if not path:
+                    continue
+                with open(path, 'rb') as f:
+                    data = f.read()
+                br = len(brotli.compress(data)) if brotli else '-'
+                self.stdout.write(f'{url:<60}{len(data):>9}{len(gzip.compress(data)):>9}{br:>9}')
+
+    def _seed(self):
+        owner = User.objects.create_user('bench', password='bench')
+        tags = [Tag.objects.create(name=n) for n in ('math', 'greedy', 'dp', 'graphs')]
+        for i in range(50):
+            p = Problem.objects.create(
+                name=f'Problem {i}', problem_id=f'{1000 + i // 5}{"ABCDE"[i % 5]}', contest_id=1000 + i // 5,
+                index='ABCDE'[i % 5], codeforces_rating=800 + 100 * (i % 20), owner=owner,
+            )
+            p.tags.set(tags[: 1 + i % 4])
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from problems.trending import compact, TRENDING_WINDOW_HOURS
+
+
+class Command(BaseCommand):
+    help = 'Drop rating-activity buckets older than the trending window and update the rolling counters (run hourly)'
+
+    def handle(self, *args, **options):
+        deleted = compact()
+        self.stdout.write(self.style.SUCCESS(f'Removed {deleted} expired buckets (window: {TRENDING_WINDOW_HOURS}h)'))
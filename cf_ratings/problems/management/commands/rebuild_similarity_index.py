@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from problems.models import Problem
+from problems.similarity import index_problems
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the MinHash/LSH similar-problems index for every problem (run once after upgrading)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Problems indexed per transaction')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        pks = list(Problem.objects.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(pks), batch_size):
+            index_problems(Problem.objects.filter(pk__in=pks[start:start + batch_size]).prefetch_related('tags'))
+        self.stdout.write(self.style.SUCCESS(f'Indexed {len(pks)} problems'))
@@ -0,0 +1,41 @@
+import time
+from pathlib import Path
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from problems.services import CF_API_BASE, CF_TIMEOUT
+
+
+class Command(BaseCommand):
+    help = 'Record live Codeforces API responses as fixtures for the mock API (serve_cf_mock --fixtures)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Directory to write <method>[.<handle>].json files to')
+        parser.add_argument('--handle', action='append', default=[], help='Handle to record user.* methods for (repeatable)')
+        parser.add_argument('--base', default=CF_API_BASE, help='API base URL to record from')
+        parser.add_argument('--delay', type=float, default=2.0, help='Delay between API calls in seconds')
+
+    def handle(self, *args, **options):
+        output = Path(options['output'])
+        output.mkdir(parents=True, exist_ok=True)
+        calls = [('problemset.problems', {}, 'problemset.problems.json')]
+        for handle in options['handle']:
+            calls += [
+                ('user.info', {'handles': handle}, f'user.info.{handle}.json'),
+                ('user.status', {'handle': handle}, f'user.status.{handle}.json'),
+                ('user.rating', {'handle': handle}, f'user.rating.{handle}.json'),
+            ]
+        for i, (method, params, filename) in enumerate(calls):
+            if i:
+                time.sleep(options['delay'])
+            try:
+                resp = requests.get(f"{options['base'].rstrip('/')}/{method}", params=params, timeout=CF_TIMEOUT * 6)
+                resp.raise_for_status()
+            except requests.RequestException as e:
+                raise CommandError(f'Failed to record {method}: {e}')
+            if resp.json().get('status') != 'OK':
+                raise CommandError(f'{method} returned {resp.json().get("comment")}')
+            (output / filename).write_bytes(resp.content)
+            self.stdout.write(f'{filename}: {len(resp.content)} bytes')
+        self.stdout.write(self.style.SUCCESS(f'Recorded {len(calls)} responses to {output}'))
@@ -0,0 +1,27 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Copy the default SQLite database into every configured replica file (local stand-in for replication)'
+
+    def handle(self, *args, **options):
+        default = settings.DATABASES['default']
+        if not default['ENGINE'].endswith('sqlite3'):
+            raise CommandError('Only SQLite databases can be copied; use real replication for other backends.')
+        if not settings.REPLICA_DATABASES:
+            raise CommandError('No replicas configured; set CF_REPLICA_DBS.')
+        src = sqlite3.connect(default['NAME'])
+        try:
+            for alias in settings.REPLICA_DATABASES:
+                dst = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+                try:
+                    src.backup(dst)
+                finally:
+                    dst.close()
+                self.stdout.write(f'Copied default -> {alias} ({settings.DATABASES[alias]["NAME"]})')
+        finally:
+            src.close()
+        self.stdout.write(self.style.SUCCESS('Done'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from problems.cf_mock import REALISTIC_PROBLEM_COUNT, REALISTIC_SUBMISSION_COUNT, MockCodeforcesServer, synthetic_problems
+
+
+class Command(BaseCommand):
+    help = 'Serve a local mock of the Codeforces API (recorded fixtures or synthetic data) until interrupted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--fixtures', help='Directory of recorded responses (see record_cf_fixtures)')
+        parser.add_argument('--problems', type=int, default=REALISTIC_PROBLEM_COUNT, help='Size of the synthetic problemset')
+        parser.add_argument('--submissions', type=int, default=REALISTIC_SUBMISSION_COUNT, help='Synthetic submissions per handle')
+        parser.add_argument('--latency', type=float, default=0.0, help='Delay before each response in seconds')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of calls answered with HTTP 503')
+        parser.add_argument('--call-limit', type=int, help='Calls allowed per --call-window before "Call limit exceeded"')
+        parser.add_argument('--call-window', type=float, default=1.0, help='Call-limit window in seconds')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for error injection')
+
+    def handle(self, *args, **options):
+        server = MockCodeforcesServer(
+            host=options['host'], port=options['port'], latency=options['latency'],
+            problems=synthetic_problems(options['problems']), fixtures=options['fixtures'],
+            error_rate=options['error_rate'], call_limit=options['call_limit'], call_window=options['call_window'],
+            seed=options['seed'], submissions=options['submissions'],
+        )
+        self.stdout.write(f'Mock Codeforces API at {server.base_url}')
+        self.stdout.write(f'Run the site against it with CF_API_BASE={server.base_url}')
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
+        self.stdout.write(f'Calls served: {dict(server.stats)}')
@@ -0,0 +1,28 @@
+import time
+from django.core.management.base import BaseCommand
+from problems.models import UserProfile
+from problems.rating_history import store_rating_changes
+from problems.services import fetch_user_rating, CodeforcesAPIError
+
+
+class Command(BaseCommand):
+    help = 'Pull Codeforces rating history for every profile with a handle, storing only contests newer than the last one stored'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delay', type=float, default=0.5, help='Delay between API calls in seconds')
+        parser.add_argument('--user', help='Only sync this username')
+
+    def handle(self, *args, **options):
+        profiles = UserProfile.objects.exclude(codeforces_handle__isnull=True).exclude(codeforces_handle='').select_related('user')
+        if options['user']:
+            profiles = profiles.filter(user__username=options['user'])
+        synced = failed = added = 0
+        for profile in profiles:
+            try:
+                added += store_rating_changes(profile.user, fetch_user_rating(profile.codeforces_handle))
+                synced += 1
+            except CodeforcesAPIError as e:
+                self.stderr.write(f'Failed to fetch {profile.codeforces_handle}: {e}')
+                failed += 1
+            time.sleep(options['delay'])
+        self.stdout.write(self.style.SUCCESS(f'Synced {synced} profiles ({added} new contests), {failed} failed'))
@@ -0,0 +1,48 @@
+from functools import partial
+
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from .models import UserProfile
+
+
+def get_profile(request):
+    """Profile of the signed-in user (None for anonymous visitors), loaded at most once per request."""
+    if not hasattr(request, '_cached_profile'):
+        user = request.user
+        profile = None
+        if user.is_authenticated:
+            profile = UserProfile.objects.filter(user=user).first() or UserProfile.objects.get_or_create(user=user)[0]
+        request._cached_profile = _attach_user(profile, user)
+    return request._cached_profile
+
+
+async def aget_profile(request):
+    if not hasattr(request, '_cached_profile'):
+        user = await request.auser()
+        profile = None
+        if user.is_authenticated:
+            profile = (await UserProfile.objects.filter(user=user).afirst()
+                       or (await UserProfile.objects.aget_or_create(user=user))[0])
+        request._cached_profile = _attach_user(profile, user)
+    return request._cached_profile
+
+
+def _attach_user(profile, user):
+    # reuse the already-loaded user so `profile.user` never costs another query
+    if profile is not None:
+        profile.user = user
+    return profile
+
+
+class UserProfileMiddleware(MiddlewareMixin):
+    """Expose the signed-in user's profile as a lazy `request.profile` (and `await request.aprofile()`),
+    mirroring `request.user` / `request.auser()`. Nothing is queried unless a view asks for it.
+
+    Profiles are created with the user (see `signals.create_user_profile`); a user whose profile is
+    missing anyway (e.g. created with a raw bulk insert) gets one the first time it is asked for, so
+    views never see None for a signed-in user.
+    """
+    def process_request(self, request):
+        request.profile = SimpleLazyObject(lambda: get_profile(request))
+        request.aprofile = partial(aget_profile, request)
@@ -0,0 +1,51 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_contest_aggregates(apps, schema_editor):
+    Problem = apps.get_model('problems', 'Problem')
+    ContestAggregate = apps.get_model('problems', 'ContestAggregate')
+    by_contest = {}
+    for row in Problem.objects.values('pk', 'contest_id', 'average_rating', 'codeforces_rating'):
+        by_contest.setdefault(row['contest_id'], []).append(row)
+    aggregates = []
+    for cid, problems in by_contest.items():
+        rated = [p['average_rating'] for p in problems if p['average_rating'] > 0]
+        hardest = max(problems, key=lambda p: (p['codeforces_rating'] or 0, p['average_rating']))
+        aggregates.append(ContestAggregate(
+            contest_id=cid,
+            problem_count=len(problems),
+            rated_count=len(rated),
+            average_rating=round(sum(rated) / len(rated), 2) if rated else 0.0,
+            hardest_problem_id=hardest['pk'],
+        ))
+    ContestAggregate.objects.bulk_create(aggregates, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0006_add_codeforces_rating_estimated'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='problem',
+            name='contest_id',
+            field=models.IntegerField(db_index=True),
+        ),
+        migrations.CreateModel(
+            name='ContestAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contest_id', models.IntegerField(unique=True)),
+                ('problem_count', models.PositiveIntegerField(default=0)),
+                ('rated_count', models.PositiveIntegerField(default=0)),
+                ('average_rating', models.FloatField(default=0.0)),
+                ('hardest_problem', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='problems.problem')),
+            ],
+        ),
+        migrations.RunPython(backfill_contest_aggregates, migrations.RunPython.noop),
+    ]
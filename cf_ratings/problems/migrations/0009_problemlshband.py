@@ -0,0 +1,75 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:22
+
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of the problems.similarity parameters and hashing at the time of this migration,
+# so later changes there cannot alter what it writes.
+NUM_PERMUTATIONS = 32
+ROWS_PER_BAND = 2
+NUM_BANDS = NUM_PERMUTATIONS // ROWS_PER_BAND
+RATING_BUCKET = 200
+
+
+def _hash64(data, seed=0):
+    digest = hashlib.blake2b(data, digest_size=8, salt=seed.to_bytes(16, 'little')).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def problem_tokens(tag_names, codeforces_rating):
+    tokens = {f'tag:{name}' for name in tag_names}
+    if codeforces_rating:
+        tokens.add(f'rating:{codeforces_rating // RATING_BUCKET}')
+        tokens.add(f'rating+:{(codeforces_rating + RATING_BUCKET // 2) // RATING_BUCKET}')
+    return tokens
+
+
+def band_keys(tokens):
+    if not tokens:
+        return []
+    encoded = [t.encode() for t in tokens]
+    signature = [min(_hash64(t, seed) for t in encoded) for seed in range(NUM_PERMUTATIONS)]
+    keys = []
+    for band in range(NUM_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        keys.append(_hash64(b'%d:' % band + b','.join(b'%d' % v for v in rows)))
+    return keys
+
+
+def backfill_lsh_bands(apps, schema_editor):
+    Problem = apps.get_model('problems', 'Problem')
+    ProblemLSHBand = apps.get_model('problems', 'ProblemLSHBand')
+    tags = {}
+    for problem_id, name in Problem.tags.through.objects.values_list('problem_id', 'tag__name'):
+        tags.setdefault(problem_id, []).append(name)
+    bands = [
+        ProblemLSHBand(problem_id=pk, band=band, key=key)
+        for pk, rating in Problem.objects.values_list('pk', 'codeforces_rating')
+        for band, key in enumerate(band_keys(problem_tokens(tags.get(pk, []), rating)))
+    ]
+    ProblemLSHBand.objects.bulk_create(bands, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0008_rating_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProblemLSHBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('key', models.BigIntegerField(db_index=True)),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_bands', to='problems.problem')),
+            ],
+            options={
+                'unique_together': {('problem', 'band')},
+            },
+        ),
+        migrations.RunPython(backfill_lsh_bands, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0009_problemlshband'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='rating_series',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.CreateModel(
+            name='RatingHistoryEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contest_id', models.IntegerField()),
+                ('contest_name', models.CharField(blank=True, max_length=255)),
+                ('rank', models.IntegerField(blank=True, null=True)),
+                ('old_rating', models.IntegerField()),
+                ('new_rating', models.IntegerField()),
+                ('rated_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_history', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'rated_at', 'new_rating'], name='ratinghistory_series_idx')],
+                'unique_together': {('user', 'contest_id')},
+            },
+        ),
+    ]
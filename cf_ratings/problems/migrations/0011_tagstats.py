@@ -0,0 +1,60 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_tag_stats(apps, schema_editor):
+    Problem = apps.get_model('problems', 'Problem')
+    Tag = apps.get_model('problems', 'Tag')
+    TagStats = apps.get_model('problems', 'TagStats')
+    UserProblem = apps.get_model('problems', 'UserProblem')
+    problems = {p['pk']: p for p in Problem.objects.values('pk', 'average_rating', 'codeforces_rating')}
+    by_tag = {}
+    for tag_id, problem_id in Problem.tags.through.objects.values_list('tag_id', 'problem_id'):
+        by_tag.setdefault(tag_id, []).append(problems[problem_id])
+    solvers = {}
+    for tag_id, user_id in UserProblem.objects.filter(status='solved').values_list('problem__tags', 'user_id').distinct():
+        if tag_id is not None:
+            solvers[tag_id] = solvers.get(tag_id, 0) + 1
+    stats = []
+    for tag_id in Tag.objects.values_list('pk', flat=True):
+        rows = by_tag.get(tag_id, [])
+        rated = [r['average_rating'] for r in rows if r['average_rating'] > 0]
+        cf = sorted(r['codeforces_rating'] for r in rows if r['codeforces_rating'] is not None)
+        if cf:
+            mid = len(cf) // 2
+            median = float(cf[mid]) if len(cf) % 2 else (cf[mid - 1] + cf[mid]) / 2
+        else:
+            median = None
+        stats.append(TagStats(
+            tag_id=tag_id,
+            problem_count=len(rows),
+            average_rating=round(sum(rated) / len(rated), 2) if rated else 0.0,
+            mean_codeforces_rating=round(sum(cf) / len(cf), 1) if cf else None,
+            median_codeforces_rating=median,
+            solver_count=solvers.get(tag_id, 0),
+        ))
+    TagStats.objects.bulk_create(stats, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0010_rating_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagStats',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='problems.tag')),
+                ('problem_count', models.PositiveIntegerField(db_index=True, default=0)),
+                ('average_rating', models.FloatField(default=0.0)),
+                ('mean_codeforces_rating', models.FloatField(blank=True, null=True)),
+                ('median_codeforces_rating', models.FloatField(blank=True, null=True)),
+                ('solver_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_tag_stats, migrations.RunPython.noop),
+    ]
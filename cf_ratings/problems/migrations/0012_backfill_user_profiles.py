@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:02
+
+from django.conf import settings
+from django.db import migrations
+
+
+def backfill_user_profiles(apps, schema_editor):
+    # Profiles used to be created lazily by views; create the missing ones once so views can rely on them.
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    UserProfile = apps.get_model('problems', 'UserProfile')
+    missing = User.objects.filter(userprofile__isnull=True).values_list('pk', flat=True)
+    UserProfile.objects.bulk_create([UserProfile(user_id=pk) for pk in missing], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0011_tagstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_user_profiles, migrations.RunPython.noop),
+    ]
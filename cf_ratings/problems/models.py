@@ -1,7 +1,11 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import Avg, Count, FloatField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Round
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from .page_cache import LIST_PAGES, problem_pages, purge_pages
+
 
 class UserProfile(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -12,10 +16,40 @@ class UserProfile(models.Model):
     max_rating = models.IntegerField(blank=True, null=True)
     rank = models.CharField(max_length=50, blank=True, null=True)
     max_rank = models.CharField(max_length=50, blank=True, null=True)
+    # Downsampled [[unix_time, rating], ...] points of the CF rating history, rebuilt on each history sync
+    rating_series = models.JSONField(default=list, blank=True)
 
     def __str__(self):
         return f"{self.user.username} ({self.codeforces_handle})" if self.codeforces_handle else self.user.username
 
+    def apply_codeforces_info(self, data):
+        """Copy rating fields from a Codeforces `user.info` result (does not save)."""
+        self.rating = data.get('rating')
+        self.max_rating = data.get('maxRating')
+        self.rank = data.get('rank')
+        self.max_rank = data.get('maxRank')
+
+
+class RatingHistoryEntry(models.Model):
+    """One rated Codeforces contest of a user (from the `user.rating` API)."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='rating_history')
+    contest_id = models.IntegerField()
+    contest_name = models.CharField(max_length=255, blank=True)
+    rank = models.IntegerField(blank=True, null=True)
+    old_rating = models.IntegerField()
+    new_rating = models.IntegerField()
+    rated_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'contest_id')
+        indexes = [
+            # covers the per-user time series read (rated_at, new_rating) without touching the table
+            models.Index(fields=['user', 'rated_at', 'new_rating'], name='ratinghistory_series_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} @ {self.contest_id}: {self.old_rating} -> {self.new_rating}"
+
 
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)
@@ -27,7 +61,7 @@ class Tag(models.Model):
 class Problem(models.Model):
     name = models.CharField(max_length=255)
     problem_id = models.CharField(max_length=20, unique=True)  # e.g., 2184G
-    contest_id = models.IntegerField()
+    contest_id = models.IntegerField(db_index=True)
     index = models.CharField(max_length=10)
     tags = models.ManyToManyField(Tag, related_name='problems')
     average_rating = models.FloatField(default=0.0)
@@ -36,24 +70,171 @@ class Problem(models.Model):
     # Whether the `codeforces_rating` value was estimated by the application (not provided by Codeforces).
     codeforces_rating_estimated = models.BooleanField(default=False)
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='owned_problems')
+    # Rating events inside the trending window; maintained by `problems.trending`.
+    recent_rating_count = models.PositiveIntegerField(default=0, db_index=True)
 
     def __str__(self):
         return f"{self.name} ({self.problem_id})"
 
     def update_average_rating(self):
-        ratings = self.ratings.all()
-        if ratings.exists():
-            avg = sum([r.value for r in ratings]) / ratings.count()
-            self.average_rating = round(avg, 2)
-        else:
-            self.average_rating = 0.0
+        avg = self.ratings.aggregate(avg=Avg('value'))['avg']
+        self.average_rating = round(avg, 2) if avg is not None else 0.0
         self.save(update_fields=['average_rating'])
 
+    @classmethod
+    def recompute_average_ratings(cls, problem_pks):
+        """Recompute `average_rating` for many problems with a single grouped UPDATE."""
+        problem_pks = list(problem_pks)
+        if not problem_pks:
+            return 0
+        avg = Rating.objects.filter(problem=OuterRef('pk')).values('problem').annotate(avg=Avg('value')).values('avg')
+        updated = cls.objects.filter(pk__in=problem_pks).update(
+            average_rating=Coalesce(Round(Subquery(avg, output_field=FloatField()), 2), Value(0.0))
+        )
+        # queryset.update() bypasses post_save, so keep the contest and tag aggregates and the
+        # cached pages in step here
+        rows = list(cls.objects.filter(pk__in=problem_pks).values_list('contest_id', 'problem_id'))
+        ContestAggregate.refresh_for(contest_id for contest_id, _ in rows)
+        TagStats.refresh_for_problems(problem_pks)
+        purge_pages(LIST_PAGES, *(problem_pages(problem_id) for _, problem_id in rows))
+        return updated
+
+
+class ContestAggregate(models.Model):
+    """Precomputed per-contest summary of the problems in the catalog.
+    Refreshed for the affected contest whenever one of its problems is added, removed or re-rated.
+    """
+    contest_id = models.IntegerField(unique=True)
+    problem_count = models.PositiveIntegerField(default=0)
+    # number of problems in the contest with at least one community rating
+    rated_count = models.PositiveIntegerField(default=0)
+    # mean of the rated problems' `average_rating` (0.0 when none are rated)
+    average_rating = models.FloatField(default=0.0)
+    # problem with the highest Codeforces rating (community average breaks ties / fills gaps)
+    hardest_problem = models.ForeignKey('Problem', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    def __str__(self):
+        return f"Contest {self.contest_id} ({self.problem_count} problems)"
+
+    @classmethod
+    def refresh_for(cls, contest_ids):
+        """Recompute the aggregates of the given contests from their problems (one read query)."""
+        contest_ids = set(contest_ids)
+        if not contest_ids:
+            return
+        by_contest = {cid: [] for cid in contest_ids}
+        rows = Problem.objects.filter(contest_id__in=contest_ids).values('pk', 'contest_id', 'average_rating', 'codeforces_rating')
+        for row in rows:
+            by_contest[row['contest_id']].append(row)
+
+        aggregates = []
+        for cid, problems in by_contest.items():
+            if not problems:
+                continue
+            rated = [p['average_rating'] for p in problems if p['average_rating'] > 0]
+            hardest = max(problems, key=lambda p: (p['codeforces_rating'] or 0, p['average_rating']))
+            aggregates.append(cls(
+                contest_id=cid,
+                problem_count=len(problems),
+                rated_count=len(rated),
+                average_rating=round(sum(rated) / len(rated), 2) if rated else 0.0,
+                hardest_problem_id=hardest['pk'],
+            ))
+        empty = [cid for cid, problems in by_contest.items() if not problems]
+        if empty:
+            cls.objects.filter(contest_id__in=empty).delete()
+        if aggregates:
+            cls.objects.bulk_create(
+                aggregates, update_conflicts=True, unique_fields=['contest_id'],
+                update_fields=['problem_count', 'rated_count', 'average_rating', 'hardest_problem'],
+            )
+
+
+class TagStats(models.Model):
+    """Precomputed per-tag statistics for the search sidebar and the tag overview page.
+    Only the tags of problems that changed are refreshed (see `refresh_for`).
+    """
+    tag = models.OneToOneField(Tag, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    problem_count = models.PositiveIntegerField(default=0, db_index=True)
+    # mean of `average_rating` over the tag's problems that have community ratings
+    average_rating = models.FloatField(default=0.0)
+    mean_codeforces_rating = models.FloatField(blank=True, null=True)
+    median_codeforces_rating = models.FloatField(blank=True, null=True)
+    # users who marked at least one problem with this tag as solved
+    solver_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.tag.name}: {self.problem_count} problems"
+
+    @classmethod
+    def refresh_for(cls, tag_ids):
+        """Recompute the stats of the given tags with three grouped queries, whatever their number."""
+        tag_ids = set(tag_ids)
+        if not tag_ids:
+            return
+        problems = Problem.objects.filter(tags__in=tag_ids)
+        counts = {
+            row['tags']: row
+            for row in problems.values('tags').annotate(
+                n=Count('pk'),
+                avg=Avg('average_rating', filter=Q(average_rating__gt=0)),
+                cf_avg=Avg('codeforces_rating'),
+            )
+        }
+        # CF ratings are multiples of 100, so a per-tag histogram is small and gives the exact median
+        histograms = {}
+        for row in problems.filter(codeforces_rating__isnull=False).values('tags', 'codeforces_rating').annotate(n=Count('pk')):
+            histograms.setdefault(row['tags'], []).append((row['codeforces_rating'], row['n']))
+        solvers = dict(
+            UserProblem.objects.filter(status=UserProblem.STATUS_SOLVED, problem__tags__in=tag_ids)
+            .values('problem__tags').annotate(n=Count('user', distinct=True)).values_list('problem__tags', 'n')
+        )
+        stats = []
+        for tag_id in tag_ids:
+            row = counts.get(tag_id, {})
+            stats.append(cls(
+                tag_id=tag_id,
+                problem_count=row.get('n', 0),
+                average_rating=round(row['avg'], 2) if row.get('avg') is not None else 0.0,
+                mean_codeforces_rating=round(row['cf_avg'], 1) if row.get('cf_avg') is not None else None,
+                median_codeforces_rating=_histogram_median(histograms.get(tag_id, [])),
+                solver_count=solvers.get(tag_id, 0),
+            ))
+        cls.objects.bulk_create(
+            stats, update_conflicts=True, unique_fields=['tag'],
+            update_fields=['problem_count', 'average_rating', 'mean_codeforces_rating', 'median_codeforces_rating', 'solver_count'],
+        )
+
+    @classmethod
+    def refresh_for_problems(cls, problem_pks):
+        cls.refresh_for(Problem.tags.through.objects.filter(problem_id__in=list(problem_pks)).values_list('tag_id', flat=True))
+
+
+def _histogram_median(histogram):
+    """Median of values given as (value, count) pairs."""
+    total = sum(n for _, n in histogram)
+    if not total:
+        return None
+    ordered = sorted(histogram)
+
+    def nth(k):
+        seen = 0
+        for value, n in ordered:
+            seen += n
+            if seen > k:
+                return value
+
+    if total % 2:
+        return float(nth(total // 2))
+    return (nth(total // 2 - 1) + nth(total // 2)) / 2
+
 
 class Rating(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='ratings')
     problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='ratings')
     value = models.PositiveSmallIntegerField(validators=[MinValueValidator(0), MaxValueValidator(10)])
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('user', 'problem')
@@ -67,6 +248,35 @@ class Rating(models.Model):
         self.problem.update_average_rating()
 
 
+class RatingActivityBucket(models.Model):
+    """Number of rating events a problem received in one hour-aligned bucket.
+    Buckets older than the trending window are folded out of `Problem.recent_rating_count`
+    and deleted by the `compact_trending` command.
+    """
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='activity_buckets')
+    bucket_start = models.DateTimeField(db_index=True)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('problem', 'bucket_start')
+
+    def __str__(self):
+        return f"{self.problem_id} @ {self.bucket_start:%Y-%m-%d %H:00}: {self.count}"
+
+
+class ProblemLSHBand(models.Model):
+    """One LSH band of a problem's MinHash signature (see `problems.similarity`)."""
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='lsh_bands')
+    band = models.PositiveSmallIntegerField()
+    key = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        unique_together = ('problem', 'band')
+
+    def __str__(self):
+        return f"{self.problem_id} band {self.band}: {self.key}"
+
+
 class UserProblem(models.Model):
     """Represents that a user has added/connected to a Problem in the site.
     A Problem record is unique per Codeforces problem; multiple users can add it to their collection via this model.
@@ -0,0 +1,116 @@
+"""Full-page cache for anonymous GETs with event-based purging.
+
+Views opt in with `AnonymousPageCacheMixin` and name the page groups their HTML depends on
+(e.g. one problem, the problem lists, one profile). Each group has a version number in the
+cache, and the version is part of every page key, so `purge_pages()` invalidates a whole group
+with one cache write and leaves every other cached page alone. Signed-in users, and requests
+with pending flash messages, always get a freshly rendered page.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+
+# home page and search results: anything listing problems with their average rating
+LIST_PAGES = 'problem-lists'
+
+
+def problem_pages(problem_id):
+    return f'problem:{problem_id.upper()}'
+
+
+def profile_pages(username):
+    return f'profile:{username}'
+
+
+def _version_key(group):
+    return f'page-version:{group}'
+
+
+def purge_pages(*groups):
+    """Invalidate every cached page in `groups` once the current transaction commits."""
+    if groups:
+        # a fresh timestamp rather than +1, so an evicted version can never come back to an old value
+        versions = {_version_key(g): time.time_ns() for g in groups}
+        transaction.on_commit(lambda: cache.set_many(versions, None))
+
+
+def _page_key(request, versions):
+    # query parameters are sorted so ?a=1&b=2 and ?b=2&a=1 share an entry
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    raw = f"{request.get_host()}{request.path}?{query}|{'|'.join(str(v) for v in versions)}"
+    return 'page:' + hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def _versions(groups, found):
+    keys = [_version_key(g) for g in groups]
+    missing = {k: time.time_ns() for k in keys if k not in found}
+    return [found.get(k) or missing[k] for k in keys], missing
+
+
+def _has_messages(request):
+    # len() loads pending messages without marking them as shown
+    return hasattr(request, '_messages') and len(get_messages(request)) > 0
+
+
+def _cacheable(request, response):
+    return (
+        response.status_code == 200 and not response.streaming and not response.cookies
+        and not response.has_header('Cache-Control') and not _has_messages(request)
+    )
+
+
+class AnonymousPageCacheMixin:
+    """Serve anonymous GETs of a view from the cache for `page_cache_timeout` seconds.
+
+    Override `get_page_cache_groups()` to list the groups whose purge should drop the page.
+    """
+    page_cache_timeout = 60
+
+    def get_page_cache_groups(self, request, *args, **kwargs):
+        return [LIST_PAGES]
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._page_cache_adispatch(request, *args, **kwargs)
+        if request.method != 'GET' or request.user.is_authenticated or _has_messages(request):
+            return super().dispatch(request, *args, **kwargs)
+        groups = self.get_page_cache_groups(request, *args, **kwargs)
+        versions, missing = _versions(groups, cache.get_many([_version_key(g) for g in groups]))
+        if missing:
+            cache.set_many(missing, None)
+        key = _page_key(request, versions)
+        cached = cache.get(key)
+        if cached is not None:
+            return HttpResponse(cached[0], content_type=cached[1])
+        response = self._render_page(super().dispatch(request, *args, **kwargs))
+        if _cacheable(request, response):
+            cache.set(key, (response.content, response['Content-Type']), self.page_cache_timeout)
+        return response
+
+    async def _page_cache_adispatch(self, request, *args, **kwargs):
+        if (request.method != 'GET' or (await request.auser()).is_authenticated
+                or await sync_to_async(_has_messages)(request)):
+            return await super().dispatch(request, *args, **kwargs)
+        groups = self.get_page_cache_groups(request, *args, **kwargs)
+        versions, missing = _versions(groups, await cache.aget_many([_version_key(g) for g in groups]))
+        if missing:
+            await cache.aset_many(missing, None)
+        key = _page_key(request, versions)
+        cached = await cache.aget(key)
+        if cached is not None:
+            return HttpResponse(cached[0], content_type=cached[1])
+        response = self._render_page(await super().dispatch(request, *args, **kwargs))
+        if _cacheable(request, response):
+            await cache.aset(key, (response.content, response['Content-Type']), self.page_cache_timeout)
+        return response
+
+    def _render_page(self, response):
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.render()
+        return response
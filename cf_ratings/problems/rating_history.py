@@ -0,0 +1,83 @@
+"""Per-user Codeforces rating history: incremental storage and a downsampled series for charts."""
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+
+from .models import RatingHistoryEntry, UserProfile
+from .page_cache import profile_pages, purge_pages
+
+# points kept in UserProfile.rating_series; enough for a profile-width chart
+SERIES_POINTS = 100
+
+
+def store_rating_changes(user, changes):
+    """Insert the `user.rating` entries newer than the last stored contest and rebuild
+    the profile's downsampled series. Returns the number of new entries."""
+    last = RatingHistoryEntry.objects.filter(user=user).order_by('-rated_at').values_list('rated_at', flat=True).first()
+    last_ts = last.timestamp() if last else 0
+    new = [
+        RatingHistoryEntry(
+            user=user,
+            contest_id=c['contestId'],
+            contest_name=c.get('contestName', '')[:255],
+            rank=c.get('rank'),
+            old_rating=c['oldRating'],
+            new_rating=c['newRating'],
+            rated_at=datetime.fromtimestamp(c['ratingUpdateTimeSeconds'], tz=dt_timezone.utc),
+        )
+        for c in changes
+        if c['ratingUpdateTimeSeconds'] > last_ts
+    ]
+    if not new:
+        return 0
+    with transaction.atomic():
+        RatingHistoryEntry.objects.bulk_create(new, ignore_conflicts=True)
+        rows = RatingHistoryEntry.objects.filter(user=user).order_by('rated_at').values_list('rated_at', 'new_rating')
+        series = downsample([(int(t.timestamp()), r) for t, r in rows], SERIES_POINTS)
+        UserProfile.objects.filter(user=user).update(rating_series=[list(p) for p in series])
+        purge_pages(profile_pages(user.username))
+    return len(new)
+
+
+def downsample(points, threshold):
+    """Largest-Triangle-Three-Buckets: reduce `points` to `threshold` while keeping its visual shape."""
+    if threshold >= len(points) or threshold < 3:
+        return list(points)
+    sampled = [points[0]]
+    bucket_size = (len(points) - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, len(points))
+        next_bucket = points[end:next_end] or [points[-1]]
+        avg_x = sum(p[0] for p in next_bucket) / len(next_bucket)
+        avg_y = sum(p[1] for p in next_bucket) / len(next_bucket)
+        ax, ay = points[a]
+        best, best_area = start, -1
+        for j in range(start, end):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def series_chart(series, width=600, height=160, pad=8):
+    """Scale a stored series to SVG polyline coordinates plus min/max labels for the template."""
+    if len(series) < 2:
+        return None
+    xs = [p[0] for p in series]
+    ys = [p[1] for p in series]
+    x0, x1 = min(xs), max(xs)
+    y0, y1 = min(ys), max(ys)
+    span_x = (x1 - x0) or 1
+    span_y = (y1 - y0) or 1
+    coords = ' '.join(
+        f'{pad + (x - x0) * (width - 2 * pad) / span_x:.1f},{height - pad - (y - y0) * (height - 2 * pad) / span_y:.1f}'
+        for x, y in series
+    )
+    return {'points': coords, 'width': width, 'height': height, 'min': y0, 'max': y1, 'last': ys[-1]}
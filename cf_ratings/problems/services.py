@@ -1,45 +1,185 @@
+import asyncio
+import re
+import ssl
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+import certifi
+import httpx
 import requests
 from django.conf import settings
 
 CF_API_BASE = 'https://codeforces.com/api'
+CF_TIMEOUT = 5
+
+
+def api_url(method):
+    # read at call time so tests/benchmarks can point it at a local mock (see cf_mock.py)
+    return f"{getattr(settings, 'CODEFORCES_API_BASE', CF_API_BASE).rstrip('/')}/{method}"
 
 
 class CodeforcesAPIError(Exception):
     pass
 
 
-def fetch_user_info(handle):
-    url = f"{CF_API_BASE}/user.info"
-    params = {'handles': handle}
+def _result(data):
+    if data.get('status') != 'OK':
+        raise CodeforcesAPIError(data.get('comment') or 'API returned non-OK status')
+    return data['result']
+
+
+def _response_result(resp):
+    """`result` of a requests/httpx response. Codeforces answers a bad handle (HTTP 400) or the call
+    limit (HTTP 503) with a FAILED body, so its comment is reported rather than the bare HTTP error."""
     try:
-        resp = requests.get(url, params=params, timeout=5)
-        resp.raise_for_status()
         data = resp.json()
-        if data.get('status') != 'OK':
-            raise CodeforcesAPIError('API returned non-OK status')
-        return data['result'][0]
-    except requests.RequestException as e:
-        raise CodeforcesAPIError(str(e))
+    except ValueError:
+        data = None
+    if isinstance(data, dict) and data.get('status') == 'FAILED':
+        raise CodeforcesAPIError(data.get('comment') or 'API returned non-OK status')
+    resp.raise_for_status()
+    if not isinstance(data, dict):
+        raise CodeforcesAPIError('API returned an invalid response')
+    return _result(data)
 
 
-def fetch_problem_by_id(problem_id):
+def _split_problem_id(problem_id):
     # problem_id is like 2184G; split into numeric prefix and alpha suffix
-    import re
     m = re.match(r'^(\d+)([A-Za-z]+)$', problem_id)
     if not m:
         raise CodeforcesAPIError('Invalid problem id format')
-    contest_id, index = m.group(1), m.group(2)
-    url = f"{CF_API_BASE}/problemset.problems"
+    return m.group(1), m.group(2)
+
+
+def _find_problem(problems, contest_id, index):
+    for p in problems:
+        if str(p.get('contestId')) == contest_id and p.get('index').upper() == index.upper():
+            return p
+    raise CodeforcesAPIError('Problem not found on Codeforces')
+
+
+def fetch_user_info(handle):
+    url = api_url('user.info')
+    params = {'handles': handle}
     try:
-        resp = requests.get(url, timeout=5)
-        resp.raise_for_status()
-        data = resp.json()
-        if data.get('status') != 'OK':
-            raise CodeforcesAPIError('API returned non-OK status')
-        problems = data['result']['problems']
-        for p in problems:
-            if str(p.get('contestId')) == contest_id and p.get('index').upper() == index.upper():
-                return p
-        raise CodeforcesAPIError('Problem not found on Codeforces')
+        resp = requests.get(url, params=params, timeout=CF_TIMEOUT)
+        return _response_result(resp)[0]
+    except requests.RequestException as e:
+        raise CodeforcesAPIError(str(e))
+
+
+def fetch_user_rating(handle):
+    """Rated-contest history of `handle`, oldest first (the API has no "since" filter)."""
+    url = api_url('user.rating')
+    try:
+        resp = requests.get(url, params={'handle': handle}, timeout=CF_TIMEOUT)
+        return _response_result(resp)
+    except requests.RequestException as e:
+        raise CodeforcesAPIError(str(e))
+
+
+def fetch_problem_by_id(problem_id):
+    contest_id, index = _split_problem_id(problem_id)
+    url = api_url('problemset.problems')
+    try:
+        resp = requests.get(url, timeout=CF_TIMEOUT)
+        return _find_problem(_response_result(resp)['problems'], contest_id, index)
     except requests.RequestException as e:
         raise CodeforcesAPIError(str(e))
+
+
+# --- Async variants (used by the ASGI views) ---
+
+# httpx connection pools are bound to the event loop that created them. Under an ASGI server the
+# loop lives as long as the process, so one pooled client is opened and closed by the lifespan
+# hooks in cf_ratings/asgi.py. Elsewhere (runserver/WSGI, where async_to_sync runs each request on
+# a fresh loop) a short-lived client is used and closed when the outermost `async_client()` exits.
+_shared_client = None
+_shared_loop = None
+_scoped_client = ContextVar('cf_async_client', default=None)
+_ssl_context = None
+
+
+def _new_async_client():
+    global _ssl_context
+    if _ssl_context is None:
+        # building the CA store dominates client creation; do it once per process
+        _ssl_context = ssl.create_default_context(cafile=certifi.where())
+    return httpx.AsyncClient(
+        verify=_ssl_context, limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    )
+
+
+async def open_shared_client():
+    global _shared_client, _shared_loop
+    _shared_client, _shared_loop = _new_async_client(), asyncio.get_running_loop()
+
+
+async def close_shared_client():
+    global _shared_client, _shared_loop
+    if _shared_client is not None:
+        await _shared_client.aclose()
+    _shared_client = _shared_loop = None
+
+
+@asynccontextmanager
+async def async_client():
+    """The client to use for Codeforces calls. Nested uses (including tasks started inside,
+    e.g. by `asyncio.gather`) share the outermost one."""
+    client = _scoped_client.get()
+    if client is None and _shared_client is not None and _shared_loop is asyncio.get_running_loop():
+        client = _shared_client
+    if client is not None:
+        yield client
+        return
+    async with _new_async_client() as client:
+        token = _scoped_client.set(client)
+        try:
+            yield client
+        finally:
+            _scoped_client.reset(token)
+
+
+async def _aget(method, params=None):
+    try:
+        async with asyncio.timeout(CF_TIMEOUT), async_client() as client:
+            resp = await client.get(api_url(method), params=params)
+            return _response_result(resp)
+    except TimeoutError:
+        raise CodeforcesAPIError(f'{method} timed out after {CF_TIMEOUT}s')
+    except (httpx.HTTPError, ValueError) as e:
+        raise CodeforcesAPIError(str(e))
+
+
+async def afetch_user_info(handle):
+    return (await _aget('user.info', {'handles': handle}))[0]
+
+
+async def afetch_user_submissions(handle):
+    return await _aget('user.status', {'handle': handle})
+
+
+async def afetch_user_rating(handle):
+    return await _aget('user.rating', {'handle': handle})
+
+
+async def afetch_problem_by_id(problem_id):
+    contest_id, index = _split_problem_id(problem_id)
+    result = await _aget('problemset.problems')
+    return _find_problem(result['problems'], contest_id, index)
+
+
+async def afetch_handle_data(handle):
+    """Fetch user info, submissions and rating history for `handle` concurrently, over one client."""
+    async with async_client():
+        return await asyncio.gather(afetch_user_info(handle), afetch_user_submissions(handle), afetch_user_rating(handle))
+
+
+def solved_problem_ids(submissions):
+    """Return the set of problem ids (e.g. 2184G) with an accepted submission."""
+    solved = set()
+    for s in submissions:
+        problem = s.get('problem') or {}
+        if s.get('verdict') == 'OK' and problem.get('contestId') and problem.get('index'):
+            solved.add(f"{problem['contestId']}{problem['index']}".upper())
+    return solved
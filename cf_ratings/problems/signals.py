@@ -1,19 +1,24 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import UserProfile, Rating
+from .models import UserProfile, Rating, Problem, ContestAggregate, TagStats, Tag, UserProblem
+from .page_cache import LIST_PAGES, problem_pages, profile_pages, purge_pages
+from .similarity import index_problems
+from .trending import record_rating_activity
 
 User = get_user_model()
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
+    # Profiles are created exactly once, with the user; users that predate this signal were
+    # backfilled by migration 0012. Other saves (e.g. last_login on every login) do nothing.
     if created:
         UserProfile.objects.create(user=instance)
 
-@receiver(post_save, sender=User)
-def ensure_user_profile(sender, instance, **kwargs):
-    # Ensure a profile exists for the user (safe for users created before signals)
-    UserProfile.objects.get_or_create(user=instance)
+@receiver(post_save, sender=Rating)
+def count_rating_activity(sender, instance, **kwargs):
+    """Feed every rating create/update into the trending counters."""
+    record_rating_activity([instance.problem_id])
 
 @receiver(post_delete, sender=Rating)
 def update_problem_average_on_rating_delete(sender, instance, **kwargs):
@@ -24,3 +29,113 @@ def update_problem_average_on_rating_delete(sender, instance, **kwargs):
     except Exception:
         # Avoid crashing on delete; log or pass in production
         pass
+
+@receiver(pre_save, sender=Problem)
+def remember_previous_contest(sender, instance, update_fields=None, **kwargs):
+    # a problem moved to another contest must also leave the old contest's aggregate
+    if instance.pk and (update_fields is None or 'contest_id' in update_fields):
+        instance._previous_contest_id = (
+            Problem.objects.filter(pk=instance.pk).values_list('contest_id', flat=True).first()
+        )
+
+@receiver(post_save, sender=Problem)
+@receiver(post_delete, sender=Problem)
+def refresh_contest_aggregate(sender, instance, **kwargs):
+    """Keep the problem's ContestAggregate in step with adds, deletes, moves and rating changes."""
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and not {'average_rating', 'codeforces_rating', 'contest_id'} & set(update_fields):
+        return
+    contest_ids = {instance.contest_id, instance.__dict__.pop('_previous_contest_id', None)} - {None}
+    ContestAggregate.refresh_for(contest_ids)
+
+@receiver(post_save, sender=Problem)
+def index_new_or_rerated_problem(sender, instance, created, update_fields=None, **kwargs):
+    """Refresh the similarity bands when a problem is added or its Codeforces rating changes."""
+    if created or update_fields is None or 'codeforces_rating' in update_fields:
+        index_problems([instance])
+
+@receiver(m2m_changed, sender=Problem.tags.through)
+def index_retagged_problem(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # tag.problems.clear(): remember which problems lose the tag
+        instance._lsh_cleared_pks = list(instance.problems.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # tag.problems.add(...): `instance` is the Tag
+        pks = pk_set if action != 'post_clear' else getattr(instance, '_lsh_cleared_pks', [])
+        index_problems(Problem.objects.filter(pk__in=pks).prefetch_related('tags'))
+    else:
+        index_problems([instance])
+
+@receiver(post_save, sender=Problem)
+def refresh_tag_stats_on_problem_change(sender, instance, created, update_fields=None, **kwargs):
+    # new problems have no tags yet; their tags are counted by the m2m handler below
+    if created:
+        return
+    if update_fields is None or {'average_rating', 'codeforces_rating'} & set(update_fields):
+        TagStats.refresh_for_problems([instance.pk])
+
+@receiver(pre_delete, sender=Problem)
+def remember_tags_of_deleted_problem(sender, instance, **kwargs):
+    instance._tag_ids = list(instance.tags.values_list('pk', flat=True))
+
+@receiver(post_delete, sender=Problem)
+def refresh_tag_stats_on_problem_delete(sender, instance, **kwargs):
+    TagStats.refresh_for(getattr(instance, '_tag_ids', []))
+
+@receiver(m2m_changed, sender=Problem.tags.through)
+def refresh_tag_stats_on_retag(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # tag.problems.add/remove/clear(): only this tag's stats change
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            TagStats.refresh_for([instance.pk])
+    elif action == 'pre_clear':
+        instance._cleared_tag_ids = list(instance.tags.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        TagStats.refresh_for(pk_set)
+    elif action == 'post_clear':
+        TagStats.refresh_for(getattr(instance, '_cleared_tag_ids', []))
+
+@receiver(post_save, sender=Tag)
+def create_tag_stats(sender, instance, created, **kwargs):
+    if created:
+        TagStats.objects.get_or_create(tag=instance)
+
+@receiver(post_save, sender=UserProblem)
+@receiver(post_delete, sender=UserProblem)
+def refresh_tag_stats_on_status_change(sender, instance, **kwargs):
+    """Solver counts depend on UserProblem.status."""
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'status' not in update_fields:
+        return
+    TagStats.refresh_for_problems([instance.problem_id])
+
+@receiver(post_save, sender=Problem)
+@receiver(post_delete, sender=Problem)
+def purge_problem_pages(sender, instance, **kwargs):
+    # also covers rating changes: Rating.save() and rating deletes re-save the problem's average
+    purge_pages(LIST_PAGES, problem_pages(instance.problem_id))
+
+@receiver(m2m_changed, sender=Problem.tags.through)
+def purge_retagged_problem_pages(sender, instance, action, reverse, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # tag.problems.add/remove/clear(): `instance` is the Tag
+        purge_pages(LIST_PAGES)
+    else:
+        purge_pages(LIST_PAGES, problem_pages(instance.problem_id))
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+@receiver(post_save, sender=UserProblem)
+@receiver(post_delete, sender=UserProblem)
+def purge_owner_profile_pages(sender, instance, **kwargs):
+    """A profile page lists the problems its user rated or collected."""
+    purge_pages(profile_pages(instance.user.username))
+
+@receiver(post_save, sender=UserProfile)
+def purge_edited_profile_pages(sender, instance, **kwargs):
+    purge_pages(profile_pages(instance.user.username))
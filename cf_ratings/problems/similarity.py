@@ -0,0 +1,75 @@
+"""MinHash/LSH index over each problem's tag set plus its Codeforces rating bucket.
+
+A problem is described by a small token set (its tags and two overlapping rating buckets,
+so close ratings always share a token). Its MinHash signature is split into bands, and
+each band is stored as one hashed `ProblemLSHBand.key`. Problems sharing at least one key
+are neighbour candidates, so the lookup is a single indexed query instead of a pairwise
+Jaccard scan over the catalog.
+"""
+import hashlib
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Problem, ProblemLSHBand
+
+NUM_PERMUTATIONS = 32
+ROWS_PER_BAND = 2
+NUM_BANDS = NUM_PERMUTATIONS // ROWS_PER_BAND
+RATING_BUCKET = 200
+
+
+def _hash64(data, seed=0):
+    digest = hashlib.blake2b(data, digest_size=8, salt=seed.to_bytes(16, 'little')).digest()
+    # signed so it fits a BigIntegerField
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def problem_tokens(tag_names, codeforces_rating):
+    tokens = {f'tag:{name}' for name in tag_names}
+    if codeforces_rating:
+        tokens.add(f'rating:{codeforces_rating // RATING_BUCKET}')
+        tokens.add(f'rating+:{(codeforces_rating + RATING_BUCKET // 2) // RATING_BUCKET}')
+    return tokens
+
+
+def minhash(tokens):
+    encoded = [t.encode() for t in tokens]
+    return [min(_hash64(t, seed) for t in encoded) for seed in range(NUM_PERMUTATIONS)]
+
+
+def band_keys(tokens):
+    if not tokens:
+        return []
+    signature = minhash(tokens)
+    keys = []
+    for band in range(NUM_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        keys.append(_hash64(b'%d:' % band + b','.join(b'%d' % v for v in rows)))
+    return keys
+
+
+def index_problems(problems):
+    """(Re)build the LSH bands of the given problems. Tags should be prefetched."""
+    problems = list(problems)
+    rows = [
+        ProblemLSHBand(problem=p, band=band, key=key)
+        for p in problems
+        for band, key in enumerate(band_keys(problem_tokens([t.name for t in p.tags.all()], p.codeforces_rating)))
+    ]
+    with transaction.atomic():
+        ProblemLSHBand.objects.filter(problem__in=problems).delete()
+        ProblemLSHBand.objects.bulk_create(rows, batch_size=1000)
+
+
+def similar_problems(problem, k=5):
+    """Top-k problems sharing at least one LSH band with `problem`, most shared bands first
+    (the number of shared bands tracks the Jaccard similarity of the token sets), with community
+    rating only breaking ties. One query: the target's keys are read in a subquery."""
+    keys = ProblemLSHBand.objects.filter(problem=problem).values('key')
+    return (
+        Problem.objects.filter(lsh_bands__key__in=keys)
+        .exclude(pk=problem.pk)
+        .annotate(shared_bands=Count('lsh_bands'))
+        .order_by('-shared_bands', '-average_rating', 'problem_id')[:k]
+    )
@@ -0,0 +1,232 @@
+from unittest import mock
+
+from django.contrib import admin, messages
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.messages import get_messages
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .admin import EstimatedCountPaginator
+from .bulk import apply_bulk_entries
+from .models import Problem, Rating, UserProblem
+from .views import HomeView
+
+
+class AdminChangelistQueryTests(TestCase):
+    """Changelist query budgets for the large tables: the number of queries must not grow with
+    the page size (no N+1 from list_display), and unfiltered lists must not run COUNT(*)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser('admin', password='admin')
+        users = [User.objects.create_user(f'user{i}') for i in range(4)]
+        problems = Problem.objects.bulk_create([
+            Problem(name=f'Problem {i}', problem_id=f'{1000 + i}A', contest_id=1000 + i, index='A', owner=users[i % 4])
+            for i in range(30)
+        ])
+        Rating.objects.bulk_create([Rating(user=u, problem=p, value=(p.pk + u.pk) % 11) for u in users for p in problems])
+        UserProblem.objects.bulk_create([
+            UserProblem(user=u, problem=p, status=UserProblem.STATUS_SOLVED if p.pk % 2 else UserProblem.STATUS_PENDING)
+            for u in users for p in problems
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def changelist_sql(self, model, per_page, expected_queries, query=''):
+        """GET the changelist at `per_page` rows per page within `expected_queries`; return the SQL run."""
+        model_admin = admin.site._registry[model]
+        url = reverse(f'admin:problems_{model._meta.model_name}_changelist') + query
+        with mock.patch.object(model_admin, 'list_per_page', per_page), self.assertNumQueries(expected_queries) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [q['sql'] for q in ctx.captured_queries]
+
+    def assert_unfiltered_budget(self, model, expected_queries):
+        # session + user + row estimate + page (+ list_filter choices), whatever the page size
+        with mock.patch.object(EstimatedCountPaginator, 'EXACT_COUNT_LIMIT', 5):
+            for per_page in (10, 50):
+                sql = self.changelist_sql(model, per_page, expected_queries)
+                self.assertFalse([q for q in sql if 'COUNT(' in q.upper()], 'unfiltered changelist ran COUNT(*)')
+
+    def assert_filtered_budget(self, model, expected_queries, query):
+        # filtered lists are counted exactly, once (show_full_result_count is off)
+        sql = self.changelist_sql(model, 10, expected_queries, query)
+        self.assertEqual(len([q for q in sql if 'COUNT(' in q.upper()]), 1)
+
+    def test_rating_changelist(self):
+        self.assert_unfiltered_budget(Rating, 5)
+        self.assert_filtered_budget(Rating, 5, '?value__exact=5')
+
+    def test_userproblem_changelist(self):
+        self.assert_unfiltered_budget(UserProblem, 4)
+        self.assert_filtered_budget(UserProblem, 4, '?status__exact=solved')
+
+    def test_problem_changelist(self):
+        self.assert_unfiltered_budget(Problem, 4)
+        self.assert_filtered_budget(Problem, 4, '?q=Problem')
+
+
+# 'default' stands in for a replica: routing goes through ReplicaReadMixin without a second database
+@override_settings(REPLICA_DATABASES=['default'])
+class ReplicaProfileViewTests(TestCase):
+    """ProfileView stacks the page cache and replica mixins, both of which dispatch async views."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', password='owner')
+        cls.other = User.objects.create_user('other', password='other')
+
+    def setUp(self):
+        # a cached page would skip the view's dispatch altogether
+        cache.clear()
+
+    def test_anonymous(self):
+        self.assertEqual(self.client.get(reverse('profile', args=['owner'])).status_code, 200)
+
+    def test_signed_in(self):
+        self.client.force_login(self.owner)
+        self.assertEqual(self.client.get(reverse('profile', args=['owner'])).status_code, 200)
+        self.assertEqual(self.client.get(reverse('profile', args=['other'])).status_code, 200)
+
+
+class PageCacheTests(TestCase):
+    """Anonymous pages are served from the cache until an event purges their group."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('rater', password='rater')
+        cls.problem = Problem.objects.create(name='Rated', problem_id='1000A', contest_id=1000, index='A', owner=cls.user)
+        cls.other = Problem.objects.create(name='Other', problem_id='1001B', contest_id=1001, index='B', owner=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def served_from_cache(self, url):
+        """GET `url` as a fresh anonymous visitor; a cache hit runs no queries at all."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = Client().get(url)
+        self.assertEqual(response.status_code, 200)
+        return not ctx.captured_queries
+
+    def test_rating_purges_problem_and_list_pages_only(self):
+        urls = ['/', '/?tab=trending', '/problem/1000A/', '/problem/1001B/']
+        for url in urls:
+            self.assertFalse(self.served_from_cache(url))
+            self.assertTrue(self.served_from_cache(url))
+        with self.captureOnCommitCallbacks(execute=True):
+            Rating.objects.create(user=self.user, problem=self.problem, value=7)
+        self.assertFalse(self.served_from_cache('/'))
+        self.assertFalse(self.served_from_cache('/?tab=trending'))
+        self.assertFalse(self.served_from_cache('/problem/1000A/'))
+        self.assertTrue(self.served_from_cache('/problem/1001B/'))
+
+    def test_recompute_average_ratings_purges_pages(self):
+        self.served_from_cache('/')
+        self.served_from_cache('/problem/1000A/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Problem.recompute_average_ratings([self.problem.pk])
+        self.assertFalse(self.served_from_cache('/'))
+        self.assertFalse(self.served_from_cache('/problem/1000A/'))
+
+    def test_query_string_order_shares_an_entry(self):
+        self.assertFalse(self.served_from_cache('/?a=1&b=2'))
+        self.assertTrue(self.served_from_cache('/?b=2&a=1'))
+        self.assertFalse(self.served_from_cache('/?a=1&b=3'))
+        self.assertFalse(self.served_from_cache('/?tab=trending'))
+
+    def anonymous_request_with_message(self, path, text):
+        # no middleware: the message is pending without a messages cookie being written
+        request = RequestFactory().get(path)
+        request.user = AnonymousUser()
+        request._messages = CookieStorage(request)
+        messages.info(request, text)
+        return request
+
+    def test_page_with_pending_messages_is_not_stored(self):
+        response = HomeView.as_view()(self.anonymous_request_with_message('/', 'Logged out successfully.'))
+        self.assertContains(response, 'Logged out successfully.')
+        self.assertFalse(self.served_from_cache('/'))
+
+    def test_cached_page_is_not_served_with_pending_messages(self):
+        self.served_from_cache('/')
+        response = HomeView.as_view()(self.anonymous_request_with_message('/', 'Logged out successfully.'))
+        self.assertContains(response, 'Logged out successfully.')
+
+    def test_signed_in_users_get_a_live_page(self):
+        self.served_from_cache('/problem/1000A/')
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/problem/1000A/')
+        self.assertTrue(ctx.captured_queries)
+        self.assertIsNotNone(response.context['rating_form'])
+        # and their page is not stored for anonymous visitors either
+        cache.clear()
+        self.client.get('/problem/1000A/')
+        self.assertFalse(self.served_from_cache('/problem/1000A/'))
+
+
+class BulkRateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('bulk', password='bulk')
+        cls.other_user = User.objects.create_user('other', password='other')
+        cls.problems = Problem.objects.bulk_create([
+            Problem(name=f'Problem {i}', problem_id=f'{1000 + i}A', contest_id=1000 + i, index='A', owner=cls.user)
+            for i in range(12)
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def post_json(self, entries):
+        return self.client.post(reverse('bulk_rate'), {'entries': entries}, content_type='application/json')
+
+    def test_json_batch_later_duplicates_win_and_unknown_ids_are_reported(self):
+        response = self.post_json([
+            {'problem_id': '1000a', 'value': 3},
+            {'problem_id': '1001A', 'status': 'pending'},
+            {'problem_id': '1000A', 'value': 8, 'status': 'solved'},
+            {'problem_id': '9999Z', 'value': 5},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'rated': 1, 'marked': 2, 'missing': ['9999Z']})
+        self.assertEqual(Rating.objects.get(user=self.user, problem__problem_id='1000A').value, 8)
+        self.assertEqual(
+            dict(UserProblem.objects.filter(user=self.user).values_list('problem__problem_id', 'status')),
+            {'1000A': 'solved', '1001A': 'pending'},
+        )
+
+    def test_rerating_updates_the_existing_rating(self):
+        problem = self.problems[0]
+        Rating.objects.create(user=self.user, problem=problem, value=2)
+        self.post_json([{'problem_id': problem.problem_id, 'value': 9}])
+        self.assertEqual(list(Rating.objects.filter(user=self.user, problem=problem).values_list('value', flat=True)), [9])
+
+    def test_average_ratings_are_recomputed(self):
+        first, second = self.problems[:2]
+        Rating.objects.create(user=self.other_user, problem=first, value=4)
+        self.post_json([{'problem_id': first.problem_id, 'value': 7}, {'problem_id': second.problem_id, 'value': 10}])
+        averages = dict(Problem.objects.filter(pk__in=[first.pk, second.pk]).values_list('problem_id', 'average_rating'))
+        self.assertEqual(averages, {first.problem_id: 5.5, second.problem_id: 10.0})
+
+    def test_form_post_with_an_empty_row_rejects_the_batch(self):
+        response = self.client.post(reverse('bulk_rate'), {
+            'problem_id': ['1000A', '1001A'], 'value': ['6', ''], 'status': ['', ''], 'next': '/',
+        })
+        self.assertRedirects(response, '/', fetch_redirect_response=False)
+        self.assertEqual([m.message for m in get_messages(response.wsgi_request)], ['Invalid entries.'])
+        self.assertFalse(Rating.objects.exists())
+        self.assertFalse(UserProblem.objects.exists())
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        # one resolve query, one rating upsert, one grouped average UPDATE, the contest/trending/tag
+        # refreshes and one status upsert, plus savepoints: the same 16 for 3 entries or 9
+        for problems in (self.problems[:3], self.problems[3:]):
+            entries = [{'problem_id': p.problem_id, 'value': 5, 'status': 'solved'} for p in problems]
+            with self.assertNumQueries(16):
+                apply_bulk_entries(self.user, entries)
@@ -0,0 +1,60 @@
+"""Rolling "trending" counters built from hourly rating-activity buckets.
+
+Every rating event bumps its problem's current-hour `RatingActivityBucket` and the
+problem's `recent_rating_count` (O(1) per event). `compact()` periodically subtracts
+buckets that fell out of the window and deletes them, so the trending list is a single
+indexed query on `Problem.recent_rating_count`.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Problem, RatingActivityBucket
+
+# 7 days of hourly buckets by default
+TRENDING_WINDOW_HOURS = getattr(settings, 'TRENDING_WINDOW_HOURS', 24 * 7)
+
+
+def bucket_start(when=None):
+    when = when or timezone.now()
+    return when.replace(minute=0, second=0, microsecond=0)
+
+
+def record_rating_activity(problem_pks, when=None):
+    """Count one rating event for each problem in `problem_pks`."""
+    problem_pks = set(problem_pks)
+    if not problem_pks:
+        return
+    start = bucket_start(when)
+    with transaction.atomic():
+        # make sure this hour's buckets exist (ones a concurrent event created first are skipped),
+        # then bump them all: three queries however many problems there are
+        RatingActivityBucket.objects.bulk_create(
+            [RatingActivityBucket(problem_id=pk, bucket_start=start, count=0) for pk in problem_pks],
+            ignore_conflicts=True,
+        )
+        RatingActivityBucket.objects.filter(bucket_start=start, problem_id__in=problem_pks).update(count=F('count') + 1)
+        Problem.objects.filter(pk__in=problem_pks).update(recent_rating_count=F('recent_rating_count') + 1)
+
+
+def compact(now=None):
+    """Fold buckets older than the trending window out of the counters and delete them.
+    Returns the number of buckets removed."""
+    cutoff = bucket_start(now) - timedelta(hours=TRENDING_WINDOW_HOURS)
+    with transaction.atomic():
+        expired = RatingActivityBucket.objects.filter(bucket_start__lt=cutoff)
+        totals = expired.values('problem_id').annotate(total=Sum('count')).values_list('problem_id', 'total')
+        for problem_pk, total in totals:
+            Problem.objects.filter(pk=problem_pk).update(
+                recent_rating_count=Greatest(F('recent_rating_count') - total, 0)
+            )
+        deleted, _ = expired.delete()
+    return deleted
+
+
+def trending_problems():
+    return Problem.objects.filter(recent_rating_count__gt=0).order_by('-recent_rating_count', '-average_rating')
@@ -8,9 +8,14 @@ urlpatterns = [
     path('logout/', views.LogoutView.as_view(), name='logout'),
     path('users/', views.UserListView.as_view(), name='users_list'),
     path('user/<str:username>/', views.ProfileView.as_view(), name='profile'),
+    path('user/<str:username>/sync/', views.SyncHandleView.as_view(), name='sync_handle'),
     path('add-problem/', views.AddProblemView.as_view(), name='add_problem'),
     path('problem/<str:problem_id>/', views.ProblemDetailView.as_view(), name='problem_detail'),
+    path('contests/', views.ContestListView.as_view(), name='contest_list'),
+    path('contest/<int:contest_id>/', views.ContestDetailView.as_view(), name='contest_detail'),
+    path('tags/', views.TagListView.as_view(), name='tag_list'),
     path('search/', views.SearchView.as_view(), name='search'),
     path('rate/<str:problem_id>/', views.RateProblemView.as_view(), name='rate_problem'),
+    path('bulk/', views.BulkRateView.as_view(), name='bulk_rate'),
     path('mark/<str:problem_id>/', views.MarkProblemView.as_view(), name='mark_problem'),
 ]
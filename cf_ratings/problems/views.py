@@ -1,16 +1,31 @@
-from django.shortcuts import render, redirect, get_object_or_404
+import json
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.views import View
 from django.views.generic import ListView
 from django.contrib.auth import login, logout as auth_logout
 from django.contrib.auth.views import LoginView as DjangoLoginView
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import AccessMixin, LoginRequiredMixin
 from django.contrib import messages
 from django.contrib.auth.models import User
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, Q
+
+from cf_ratings.db_router import ReplicaReadMixin
 
-from .forms import RegisterForm, UserProfileForm, AddProblemForm, RatingForm
-from .models import UserProfile, Problem, Tag, Rating, UserProblem
-from .services import fetch_user_info, fetch_problem_by_id, CodeforcesAPIError
+from .bulk import apply_bulk_entries
+from .page_cache import AnonymousPageCacheMixin, problem_pages, profile_pages
+from .forms import RegisterForm, UserProfileForm, AddProblemForm, RatingForm, BulkEntryForm
+from .models import UserProfile, Problem, Tag, Rating, UserProblem, ContestAggregate, TagStats
+from .rating_history import series_chart, store_rating_changes
+from .similarity import similar_problems
+from .trending import trending_problems, TRENDING_WINDOW_HOURS
+from .services import (
+    CodeforcesAPIError, afetch_handle_data, afetch_problem_by_id, afetch_user_info, solved_problem_ids,
+)
 
 
 class RegisterView(View):
@@ -40,17 +55,23 @@ class LogoutView(View):
         return redirect('home')
 
 
-class HomeView(ListView):
+class HomeView(AnonymousPageCacheMixin, ReplicaReadMixin, ListView):
     model = Problem
+    page_cache_timeout = 30
     template_name = 'home.html'
     context_object_name = 'problems'
 
     def get_queryset(self):
+        if self.request.GET.get('tab') == 'trending':
+            # Most rated within the trending window; served from the indexed rolling counter
+            return trending_problems().prefetch_related('tags')
         # Ensure unique problems and sort by average rating descending
         return Problem.objects.prefetch_related('tags').order_by('-average_rating').distinct()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context['tab'] = 'trending' if self.request.GET.get('tab') == 'trending' else 'all'
+        context['trending_window_days'] = TRENDING_WINDOW_HOURS // 24
         context['rating_choices'] = list(range(0, 11))
         problems = list(context.get('problems', []))
         if self.request.user.is_authenticated:
@@ -95,22 +116,27 @@ class RateProblemView(LoginRequiredMixin, View):
         return redirect('problem_detail', problem_id=problem.problem_id)
 
 
-class UserListView(ListView):
+class UserListView(ReplicaReadMixin, ListView):
     model = User
     template_name = 'users_list.html'
     context_object_name = 'users'
 
+    def get_queryset(self):
+        return User.objects.select_related('userprofile')
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         users = list(context.get('users', []))
+        # unique problems each user has added or rated; UNION drops the duplicates
+        contributions = Counter(
+            user_id for user_id, _ in UserProblem.objects.values_list('user_id', 'problem_id').union(
+                Rating.objects.values_list('user_id', 'problem_id')
+            )
+        )
         users_data = []
         for u in users:
-            profile, _ = UserProfile.objects.get_or_create(user=u)
-            # unique problems the user has added
-            added = set(UserProblem.objects.filter(user=u).values_list('problem__problem_id', flat=True))
-            # unique problems the user has rated
-            rated = set(Rating.objects.filter(user=u).values_list('problem__problem_id', flat=True))
-            contrib_count = len(added.union(rated))
+            profile = getattr(u, 'userprofile', None)
+            contrib_count = contributions[u.pk]
             # compute star tier (natural mapping)
             if contrib_count >= 500:
                 stars = 5
@@ -136,18 +162,47 @@ class UserListView(ListView):
         return context
 
 
-class ProfileView(View):
-    def get(self, request, username):
-        user = get_object_or_404(User, username=username)
-        profile, _ = UserProfile.objects.get_or_create(user=user)
+async def _aresolve_user(request):
+    """Load the session user without blocking the event loop and pin it on the request,
+    so later sync code (templates, forms) does not lazily query it again."""
+    request.user = await request.auser()
+    return request.user
+
+
+class AsyncLoginRequiredMixin(AccessMixin):
+    """Async counterpart of LoginRequiredMixin for views whose handlers are coroutines."""
+    async def dispatch(self, request, *args, **kwargs):
+        user = await _aresolve_user(request)
+        if not user.is_authenticated:
+            return self.handle_no_permission()
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class ProfileView(AnonymousPageCacheMixin, ReplicaReadMixin, View):
+    page_cache_timeout = 60
+
+    def get_page_cache_groups(self, request, username):
+        return [profile_pages(username)]
+
+    async def get(self, request, username):
+        viewer = await _aresolve_user(request)
+        if viewer.username == username:
+            profile = await request.aprofile()
+            user = viewer
+        else:
+            profile = await aget_object_or_404(UserProfile.objects.select_related('user'), user__username=username)
+            user = profile.user
         cf_data = None
         if profile.codeforces_handle:
             try:
-                cf_data = fetch_user_info(profile.codeforces_handle)
+                cf_data = await afetch_user_info(profile.codeforces_handle)
             except CodeforcesAPIError as e:
                 messages.error(request, f"Codeforces fetch error: {e}")
+        return await sync_to_async(self.render_profile)(request, user, profile, cf_data)
+
+    def render_profile(self, request, user, profile, cf_data):
         form = None
-        if request.user.username == username:
+        if request.user.username == user.username:
             form = UserProfileForm(instance=profile)
         # list problems this user has added or rated
         rated = Rating.objects.filter(user=user).select_related('problem')
@@ -160,50 +215,75 @@ class ProfileView(View):
             p.user_rating = rating_map.get(p.problem_id)
             p.user_status = status_map.get(p.problem_id)
         # expose rating choices for the template's rating form
-        return render(request, 'profile.html', {'profile_user': user, 'profile': profile, 'cf_data': cf_data, 'form': form, 'user_problems': user_problems, 'rating_choices': list(range(0, 11))})
+        return render(request, 'profile.html', {'profile_user': user, 'profile': profile, 'cf_data': cf_data, 'form': form, 'user_problems': user_problems, 'rating_choices': list(range(0, 11)), 'rating_chart': series_chart(profile.rating_series)})
 
-    def post(self, request, username):
+    async def post(self, request, username):
         # edit profile (only owner)
-        if request.user.username != username:
+        user = await _aresolve_user(request)
+        if user.username != username:
             messages.error(request, 'Permission denied.')
             return redirect('profile', username=username)
-        profile, _ = UserProfile.objects.get_or_create(user=request.user)
+        profile = await request.aprofile()
         form = UserProfileForm(request.POST, request.FILES, instance=profile)
-        if form.is_valid():
-            p = form.save()
-            # fetch CF data
-            if p.codeforces_handle:
-                try:
-                    data = fetch_user_info(p.codeforces_handle)
-                    p.rating = data.get('rating')
-                    p.max_rating = data.get('maxRating')
-                    p.rank = data.get('rank')
-                    p.max_rank = data.get('maxRank')
-                    p.save()
-                    messages.success(request, 'Profile updated and Codeforces data fetched.')
-                except CodeforcesAPIError as e:
-                    messages.warning(request, f'Profile saved but Codeforces fetch failed: {e}')
-            else:
-                messages.success(request, 'Profile updated.')
-            return redirect('profile', username=username)
-        return render(request, 'profile_edit.html', {'form': form})
+        if not await sync_to_async(form.is_valid)():
+            return await sync_to_async(render)(request, 'profile_edit.html', {'form': form})
+        p = await sync_to_async(form.save)()
+        # fetch CF data
+        if p.codeforces_handle:
+            try:
+                data = await afetch_user_info(p.codeforces_handle)
+                p.apply_codeforces_info(data)
+                await p.asave()
+                messages.success(request, 'Profile updated and Codeforces data fetched.')
+            except CodeforcesAPIError as e:
+                messages.warning(request, f'Profile saved but Codeforces fetch failed: {e}')
+        else:
+            messages.success(request, 'Profile updated.')
+        return redirect('profile', username=username)
 
 
-class AddProblemView(LoginRequiredMixin, View):
-    def get(self, request):
+class SyncHandleView(AsyncLoginRequiredMixin, View):
+    """Refresh the owner's Codeforces profile and rating history, and mark catalog problems they
+    solved on CF as solved. User info, submissions and rating history are fetched concurrently."""
+    async def post(self, request, username):
+        if request.user.username != username:
+            messages.error(request, 'Permission denied.')
+            return redirect('profile', username=username)
+        profile = await request.aprofile()
+        if not profile.codeforces_handle:
+            messages.error(request, 'Set a Codeforces handle first.')
+            return redirect('profile', username=username)
+        try:
+            info, submissions, rating_changes = await afetch_handle_data(profile.codeforces_handle)
+        except CodeforcesAPIError as e:
+            messages.error(request, f'Codeforces sync failed: {e}')
+            return redirect('profile', username=username)
+        profile.apply_codeforces_info(info)
+        await profile.asave(update_fields=['rating', 'max_rating', 'rank', 'max_rank'])
+        entries = [{'problem_id': pid, 'status': UserProblem.STATUS_SOLVED} for pid in solved_problem_ids(submissions)]
+        result = await sync_to_async(apply_bulk_entries)(request.user, entries)
+        new_contests = await sync_to_async(store_rating_changes)(request.user, rating_changes)
+        messages.success(
+            request,
+            f"Codeforces data synced; {result['marked']} catalog problems marked solved, {new_contests} new rated contests.",
+        )
+        return redirect('profile', username=username)
+
+
+class AddProblemView(AsyncLoginRequiredMixin, View):
+    async def get(self, request):
         form = AddProblemForm()
-        return render(request, 'add_problem.html', {'form': form})
+        return await sync_to_async(render)(request, 'add_problem.html', {'form': form})
 
-    def post(self, request):
+    async def post(self, request):
         form = AddProblemForm(request.POST)
-        if form.is_valid():
+        if await sync_to_async(form.is_valid)():
             pid = form.cleaned_data['problem_id'].upper()
             # If the problem already exists in DB, attach it to the user's collection instead of erroring
-            problem_obj = Problem.objects.filter(problem_id__iexact=pid).first()
+            problem_obj = await Problem.objects.filter(problem_id__iexact=pid).afirst()
             if problem_obj:
                 # Attach to user's collection
-                from .models import UserProblem
-                up, created = UserProblem.objects.get_or_create(user=request.user, problem=problem_obj)
+                up, created = await UserProblem.objects.aget_or_create(user=request.user, problem=problem_obj)
                 if created:
                     messages.success(request, 'Problem already existed — added to your collection.')
                 else:
@@ -211,29 +291,34 @@ class AddProblemView(LoginRequiredMixin, View):
                 return redirect('problem_detail', problem_id=problem_obj.problem_id)
 
             try:
-                p = fetch_problem_by_id(pid)
-                name = p.get('name')
-                contest_id = p.get('contestId')
-                index = p.get('index')
-                tags = p.get('tags', [])
-                problem_obj = Problem.objects.create(
-                    name=name, problem_id=pid, contest_id=contest_id, index=index, owner=request.user,
-                    codeforces_rating=p.get('rating')
-                )
-                for t in tags:
-                    tag_obj, _ = Tag.objects.get_or_create(name=t)
-                    problem_obj.tags.add(tag_obj)
-                # Add to user's collection
-                from .models import UserProblem
-                UserProblem.objects.get_or_create(user=request.user, problem=problem_obj)
+                p = await afetch_problem_by_id(pid)
+                problem_obj = await sync_to_async(self.create_problem)(request.user, pid, p)
                 messages.success(request, 'Problem added successfully.')
                 return redirect('problem_detail', problem_id=problem_obj.problem_id)
             except CodeforcesAPIError as e:
                 messages.error(request, f'Error fetching problem: {e}')
-        return render(request, 'add_problem.html', {'form': form})
+        return await sync_to_async(render)(request, 'add_problem.html', {'form': form})
+
+    def create_problem(self, user, pid, p):
+        with transaction.atomic():
+            problem_obj = Problem.objects.create(
+                name=p.get('name'), problem_id=pid, contest_id=p.get('contestId'), index=p.get('index'), owner=user,
+                codeforces_rating=p.get('rating')
+            )
+            # one add() so the m2m signals re-index the problem and refresh tag stats once
+            tag_objs = [Tag.objects.get_or_create(name=t)[0] for t in p.get('tags', [])]
+            problem_obj.tags.add(*tag_objs)
+            # Add to user's collection
+            UserProblem.objects.get_or_create(user=user, problem=problem_obj)
+        return problem_obj
+
 
+class ProblemDetailView(AnonymousPageCacheMixin, View):
+    page_cache_timeout = 120
+
+    def get_page_cache_groups(self, request, problem_id):
+        return [problem_pages(problem_id)]
 
-class ProblemDetailView(View):
     def get(self, request, problem_id):
         problem = get_object_or_404(Problem, problem_id__iexact=problem_id)
         rating_form = None
@@ -241,7 +326,8 @@ class ProblemDetailView(View):
         if request.user.is_authenticated:
             user_rating = Rating.objects.filter(user=request.user, problem=problem).first()
             rating_form = RatingForm(instance=user_rating)
-        return render(request, 'problem_detail.html', {'problem': problem, 'rating_form': rating_form, 'user_rating': user_rating})
+        similar = similar_problems(problem, k=5)
+        return render(request, 'problem_detail.html', {'problem': problem, 'rating_form': rating_form, 'user_rating': user_rating, 'similar_problems': similar})
 
 
 class RateProblemView(LoginRequiredMixin, View):
@@ -266,12 +352,68 @@ class RateProblemView(LoginRequiredMixin, View):
         return redirect('problem_detail', problem_id=problem.problem_id)
 
 
-class SearchView(View):
+class ContestListView(ListView):
+    """Contests in the catalog, read from the precomputed ContestAggregate table."""
+    model = ContestAggregate
+    template_name = 'contests.html'
+    context_object_name = 'contests'
+    paginate_by = 50
+
+    def get_queryset(self):
+        return ContestAggregate.objects.select_related('hardest_problem').order_by('-contest_id')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        contests = list(context['contests'])
+        solved_map = {}
+        if self.request.user.is_authenticated:
+            # one grouped query for the current user's solved count per contest on this page
+            solved_map = dict(
+                UserProblem.objects.filter(
+                    user=self.request.user, status=UserProblem.STATUS_SOLVED,
+                    problem__contest_id__in=[c.contest_id for c in contests],
+                ).values('problem__contest_id').annotate(solved=Count('id')).values_list('problem__contest_id', 'solved')
+            )
+        for c in contests:
+            c.user_solved = solved_map.get(c.contest_id, 0)
+        context['contests'] = contests
+        return context
+
+
+class ContestDetailView(View):
+    def get(self, request, contest_id):
+        contest = get_object_or_404(ContestAggregate.objects.select_related('hardest_problem'), contest_id=contest_id)
+        problems = list(Problem.objects.filter(contest_id=contest_id).prefetch_related('tags').order_by('index'))
+        rating_map = {}
+        status_map = {}
+        if request.user.is_authenticated:
+            rating_map = dict(Rating.objects.filter(user=request.user, problem__in=problems).values_list('problem_id', 'value'))
+            status_map = dict(UserProblem.objects.filter(user=request.user, problem__in=problems).values_list('problem_id', 'status'))
+        for p in problems:
+            p.user_rating = rating_map.get(p.pk)
+            p.user_status = status_map.get(p.pk)
+        solved = sum(1 for p in problems if p.user_status == UserProblem.STATUS_SOLVED)
+        return render(request, 'contest_detail.html', {'contest': contest, 'problems': problems, 'user_solved': solved})
+
+
+class TagListView(ReplicaReadMixin, ListView):
+    """Tag overview, read from the precomputed TagStats table in one query."""
+    model = TagStats
+    template_name = 'tags.html'
+    context_object_name = 'tag_stats'
+
+    def get_queryset(self):
+        return TagStats.objects.select_related('tag').order_by('-problem_count', 'tag__name')
+
+
+class SearchView(AnonymousPageCacheMixin, ReplicaReadMixin, View):
+    page_cache_timeout = 60
+
     def get(self, request):
         tag = request.GET.get('tag')
         pid = request.GET.get('problem_id')
         results = None
-        tags = Tag.objects.order_by('name')
+        tags = Tag.objects.select_related('stats').order_by('name')
         id_query = None
         id_not_found = False
 
@@ -328,4 +470,69 @@ class MarkProblemView(LoginRequiredMixin, View):
         up.status = status
         up.save()
         messages.success(request, f'Problem marked as {status}.')
-        return redirect(request.POST.get('next') or request.META.get('HTTP_REFERER') or 'home')
\ No newline at end of file
+        return redirect(request.POST.get('next') or request.META.get('HTTP_REFERER') or 'home')
+
+
+class BulkRateView(LoginRequiredMixin, View):
+    """Rate and/or mark many problems in one request.
+
+    Accepts either a JSON body ``{"entries": [{"problem_id": ..., "value": ..., "status": ...}]}``
+    (answered with JSON) or a regular form POST with parallel ``problem_id``/``value``/``status``
+    lists (answered with a redirect to ``next``).
+    """
+    MAX_ENTRIES = 500
+
+    def post(self, request):
+        is_json = request.content_type == 'application/json'
+        if is_json:
+            try:
+                raw_entries = json.loads(request.body or b'{}').get('entries')
+            except (ValueError, AttributeError):
+                raw_entries = None
+            if not isinstance(raw_entries, list):
+                return JsonResponse({'error': 'Expected a JSON object with an "entries" list.'}, status=400)
+        else:
+            pids = request.POST.getlist('problem_id')
+            values = request.POST.getlist('value')
+            statuses = request.POST.getlist('status')
+            raw_entries = [
+                {
+                    'problem_id': pid,
+                    'value': values[i] if i < len(values) else '',
+                    'status': statuses[i] if i < len(statuses) else '',
+                }
+                for i, pid in enumerate(pids)
+            ]
+
+        if len(raw_entries) > self.MAX_ENTRIES:
+            return self._respond(request, is_json, error=f'At most {self.MAX_ENTRIES} entries per request.')
+
+        entries = []
+        errors = {}
+        for i, raw in enumerate(raw_entries):
+            form = BulkEntryForm(raw if isinstance(raw, dict) else {})
+            if form.is_valid():
+                entries.append(form.cleaned_data)
+            else:
+                errors[i] = form.errors.get_json_data()
+        if errors:
+            return self._respond(request, is_json, error='Invalid entries.', details=errors)
+
+        result = apply_bulk_entries(request.user, entries)
+        return self._respond(request, is_json, result=result)
+
+    def _respond(self, request, is_json, result=None, error=None, details=None):
+        if is_json:
+            if error:
+                payload = {'error': error}
+                if details:
+                    payload['details'] = details
+                return JsonResponse(payload, status=400)
+            return JsonResponse(result)
+        if error:
+            messages.error(request, error)
+        else:
+            messages.success(request, f"Saved {result['rated']} ratings and {result['marked']} statuses.")
+            if result['missing']:
+                messages.warning(request, f"Unknown problems skipped: {', '.join(result['missing'])}")
+        return redirect(request.POST.get('next') or request.META.get('HTTP_REFERER') or 'home')
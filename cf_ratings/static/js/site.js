@@ -0,0 +1,19 @@
+document.addEventListener('DOMContentLoaded', () => {
+  const burgers = Array.from(document.querySelectorAll('.navbar-burger'));
+  burgers.forEach(burger => {
+    burger.addEventListener('click', () => {
+      const targetId = burger.dataset.target;
+      const target = document.getElementById(targetId);
+      burger.classList.toggle('is-active');
+      if (target) { target.classList.toggle('is-active'); }
+    });
+  });
+  const deletes = Array.from(document.querySelectorAll('.notification .delete'));
+  deletes.forEach(del => {
+    del.addEventListener('click', () => {
+      const notification = del.parentNode;
+      notification.style.opacity = '0';
+      setTimeout(() => notification.remove(), 300);
+    });
+  });
+});